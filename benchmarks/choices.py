@@ -0,0 +1,109 @@
+"""
+Compare the cached size, latency and memory of the form choices encodings.
+
+    python -m benchmarks.choices --forms 50000
+
+Each encoding is pickled as it is stored in the cache, and measured when
+loaded and used to validate an id or search titles.
+"""
+
+import argparse
+import pickle
+import sys
+import tracemalloc
+
+from django.test import override_settings
+
+from benchmarks.run import measure
+from wagtail_jotform.choices import FormChoices
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--forms", type=int, default=20000, help="Forms in the account")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each benchmark")
+    return parser.parse_args(argv)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def search_list(choices, query):
+    # How choices were searched before `FormChoices`
+    query = query.casefold()
+    prefix_matches = []
+    substring_matches = []
+    for form_id, title in choices:
+        folded_title = title.casefold()
+        if folded_title.startswith(query):
+            prefix_matches.append((form_id, title))
+        elif query in folded_title or form_id.startswith(query):
+            substring_matches.append((form_id, title))
+    return prefix_matches + substring_matches
+
+
+def benchmark_encoding(choices, encode, repeat):
+    payload = pickle.dumps(encode(choices))
+    form_id = choices[len(choices) // 2][0]
+
+    def validate():
+        loaded = pickle.loads(payload)
+        if isinstance(loaded, FormChoices):
+            return loaded.has_id(form_id)
+        return any(id == form_id for id, title in loaded)
+
+    def search():
+        loaded = pickle.loads(payload)
+        if isinstance(loaded, FormChoices):
+            return loaded.search("form 1")
+        return search_list(loaded, "form 1")
+
+    return {
+        "bytes": len(payload),
+        "dumps": measure(lambda: pickle.dumps(encode(choices)), repeat),
+        "loads": measure(lambda: pickle.loads(payload), repeat),
+        "validate": measure(validate, repeat),
+        "search": measure(search, repeat),
+        "loads_peak_bytes": peak_memory(lambda: pickle.loads(payload)),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    choices = [
+        (str(230000000000000 + i), f"Form {i} signup") for i in range(args.forms)
+    ]
+
+    results = {"list": benchmark_encoding(choices, list, args.repeat)}
+    with override_settings(WAGTAIL_JOTFORM={"CHOICES_COMPRESS_THRESHOLD": None}):
+        results["columnar"] = benchmark_encoding(choices, FormChoices, args.repeat)
+    with override_settings(WAGTAIL_JOTFORM={"CHOICES_COMPRESS_THRESHOLD": 0}):
+        results["compressed"] = benchmark_encoding(choices, FormChoices, args.repeat)
+
+    print(f"{args.forms} forms")
+    print(
+        f"{'':<12}{'bytes':>10}{'dumps':>10}{'loads':>10}{'validate':>10}"
+        f"{'search':>10}{'load peak':>12}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<12}{result['bytes']:>10}"
+            f"{result['dumps']['median_ms']:>8.2f}ms"
+            f"{result['loads']['median_ms']:>8.2f}ms"
+            f"{result['validate']['median_ms']:>8.2f}ms"
+            f"{result['search']['median_ms']:>8.2f}ms"
+            f"{result['loads_peak_bytes']:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Measure wagtail_jotform against a local stub of the Jotform API.
+
+    python -m benchmarks.run --forms 5000 --latency 0.05
+
+Timings are written to a JSON file, and compared with a baseline if one is
+given, exiting with an error if any benchmark's median, or fastest run for
+those in `COMPARED_BY_MIN`, is slower than the baseline's by more than
+`--tolerance`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wagtail_jotform.tests.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+)
+
+from wagtail.models import Page  # noqa: E402
+
+from benchmarks.stub_server import StubJotform  # noqa: E402
+from wagtail_jotform.cache import local_cache  # noqa: E402
+from wagtail_jotform.client import reset_client  # noqa: E402
+from wagtail_jotform.models import (  # noqa: E402
+    EmbeddedFormPage,
+    FormPropertiesPush,
+    jot_form_choices,
+)
+from wagtail_jotform.wagtail_hooks import do_after_publish_page  # noqa: E402
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+# Compared with the baseline by their fastest run rather than their median.
+# Rendering the editor is mostly Wagtail's work, and its median varies too much
+# between runs with garbage collection and other load on the machine.
+COMPARED_BY_MIN = {"edit_view_render"}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--forms", type=int, default=1000, help="Forms in the account")
+    parser.add_argument(
+        "--page-size", type=int, default=1000, help="Most forms the API returns a page"
+    )
+    parser.add_argument("--limit", type=int, default=100, help="LIMIT setting")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds added to each response"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="Share of requests that fail"
+    )
+    parser.add_argument(
+        "--limit-left", type=int, default=100000, help="Starting daily API budget"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each benchmark")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=BENCHMARKS_DIR / "results.json",
+        help="Where to write the results",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Results to compare with, skipped if the file doesn't exist",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="How much slower than the baseline a median may be",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.5,
+        help="Milliseconds a median may always be slower by, to ignore jitter",
+    )
+    return parser.parse_args(argv)
+
+
+def measure(func, repeat, setup=None, number=1):
+    # Warm up imports, connections and caches outside the timed runs
+    if setup is not None:
+        setup()
+    func()
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        # Very fast benchmarks are timed over `number` calls, so each run isn't
+        # dominated by timer resolution and scheduling jitter
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def clear_caches():
+    cache.clear()
+    local_cache.clear()
+
+
+def run_benchmarks(stub, repeat):
+    call_command("loaddata", "test.json", verbosity=0)
+    homepage = Page.objects.get(url_path="/home/")
+    page = homepage.add_child(
+        instance=EmbeddedFormPage(
+            title="Embedded Form Page",
+            slug="embedded-form-page",
+            form=stub.form(0)["id"],
+        )
+    )
+    user = get_user_model().objects.create_superuser("admin", "admin@example.com", None)
+    client = Client()
+    client.force_login(user)
+    form_class = EmbeddedFormPage.get_edit_handler().get_form_class()
+    edit_url = f"/admin/pages/{page.pk}/edit/"
+
+    def edit_view():
+        response = client.get(edit_url)
+        assert response.status_code == 200, response.status_code
+
+    def reset_push():
+        FormPropertiesPush.objects.filter(page=page).delete()
+
+    results = {}
+    results["jot_form_choices_cold"] = measure(
+        jot_form_choices, repeat, setup=clear_caches
+    )
+    jot_form_choices()
+    results["jot_form_choices_warm"] = measure(jot_form_choices, repeat, number=100)
+    results["admin_form_construction"] = measure(
+        lambda: form_class(instance=page, for_user=user), repeat, number=20
+    )
+    results["edit_view_render"] = measure(edit_view, repeat)
+    results["publish_hook"] = measure(
+        lambda: do_after_publish_page(None, page), repeat, setup=reset_push
+    )
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta=0):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        stat = "min_ms" if name in COMPARED_BY_MIN else "median_ms"
+        expected = baseline[name][stat]
+        allowed = max(expected * (1 + tolerance), expected + min_delta)
+        if result[stat] > allowed:
+            regressions.append(
+                f"{name}: {result[stat]}ms, baseline {expected}ms ({stat})"
+            )
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = {
+        "forms": args.forms,
+        "page_size": args.page_size,
+        "limit": args.limit,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "limit_left": args.limit_left,
+        "repeat": args.repeat,
+    }
+
+    stub = StubJotform(
+        forms=args.forms,
+        page_size=args.page_size,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        limit_left=args.limit_left,
+    )
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        with stub, override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            },
+            WAGTAIL_JOTFORM={
+                "API_URL": stub.url,
+                "API_KEY": "benchmark-key",
+                "LIMIT": args.limit,
+                "BACKOFF_FACTOR": 0,
+            },
+        ):
+            reset_client()
+            clear_caches()
+            results = run_benchmarks(stub, args.repeat)
+            api_requests = stub.requests
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    output = {
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "api_requests": api_requests,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(output, indent=2) + "\n")
+
+    for name, result in results.items():
+        print(f"{name:<28}{result['median_ms']:>10.3f}ms median")
+    print(f"API requests: {api_requests}")
+
+    if args.baseline.exists() and args.baseline.resolve() != args.output.resolve():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != config:
+            print("The baseline was recorded with a different config, not comparing.")
+        elif regressions := compare(
+            results, baseline["results"], args.tolerance, args.min_delta
+        ):
+            print("Slower than the baseline:", *regressions, sep="\n  ")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+A local HTTP server that answers the Jotform API endpoints used by
+wagtail_jotform, with a configurable account size, latency, error rate and
+daily request budget.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FORM_PATH = re.compile(r"^/form/(?P<form_id>\w+)/(?P<endpoint>\w+)$")
+
+
+class StubJotform:
+    """
+    A fake Jotform account of `forms` forms, answering on a free local port.
+
+    Each request is delayed by `latency` seconds and fails with a 503 at
+    `error_rate`. `limit-left` starts at `limit_left` and goes down by one per
+    request, and requests are answered with a 429 once it reaches 0.
+    """
+
+    def __init__(
+        self,
+        forms=100,
+        page_size=1000,
+        latency=0,
+        error_rate=0,
+        limit_left=100000,
+        submissions=0,
+        seed=0,
+    ):
+        self.forms = forms
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.limit_left = limit_left
+        self.submissions = submissions
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def form(self, index):
+        return {
+            "id": str(200000000000000 + index),
+            "title": f"Form {index:05d}",
+            "status": "ENABLED",
+            "url": f"https://form.jotform.com/{200000000000000 + index}",
+            "height": "539",
+            "count": str(self.submissions),
+            "created_at": "2020-10-10 10:00:00",
+            "updated_at": "2020-10-10 10:00:00",
+        }
+
+    def submission(self, form_id, index):
+        return {
+            "id": f"{form_id}{index:06d}",
+            "form_id": form_id,
+            "status": "ACTIVE",
+            "created_at": "2020-10-10 10:00:00",
+            "answers": {"3": {"name": "email", "answer": f"{index}@example.com"}},
+        }
+
+    def _take_request(self):
+        with self._lock:
+            self.requests += 1
+            if self.limit_left <= 0:
+                return 429, 0
+            self.limit_left -= 1
+            if self._random.random() < self.error_rate:
+                return 503, self.limit_left
+            return 200, self.limit_left
+
+    def _page(self, query, count, item):
+        limit = min(int(query.get("limit", [self.page_size])[0]), self.page_size)
+        offset = int(query.get("offset", [0])[0])
+        content = [item(index) for index in range(offset, min(offset + limit, count))]
+        return {
+            "content": content,
+            # wagtail_jotform reads `count` as the size of the whole listing
+            "resultSet": {"offset": offset, "limit": limit, "count": count},
+        }
+
+    def respond(self, method, path, query):
+        status, limit_left = self._take_request()
+        if self.latency:
+            time.sleep(self.latency)
+        if status != 200:
+            return status, {"responseCode": status, "limit-left": limit_left}
+
+        if method == "GET" and path == "/user/forms":
+            body = self._page(query, self.forms, self.form)
+        elif match := FORM_PATH.match(path):
+            form_id = match["form_id"]
+            if method == "GET" and match["endpoint"] == "submissions":
+                body = self._page(
+                    query,
+                    self.submissions,
+                    lambda index: self.submission(form_id, index),
+                )
+            elif method == "POST":
+                body = {"content": {}}
+            else:
+                return 404, {"responseCode": 404, "limit-left": limit_left}
+        else:
+            return 404, {"responseCode": 404, "limit-left": limit_left}
+
+        body.update(responseCode=200, message="success")
+        body["limit-left"] = limit_left
+        return 200, body
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body without waiting for an ACK in between
+            disable_nagle_algorithm = True
+
+            def _respond(self, method):
+                if length := int(self.headers.get("Content-Length") or 0):
+                    self.rfile.read(length)
+                url = urlsplit(self.path)
+                status, body = stub.respond(method, url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -8,13 +8,13 @@ this_directory = path.abspath(path.dirname(__file__))
 with open(path.join(this_directory, "README.md"), encoding="utf-8") as f:
     long_description = f.read()
 
-testing_extras = ["coverage>=6.4.1", "tox>=4.11.0"]
+testing_extras = ["coverage>=6.4.1", "django-debug-toolbar>=4.4", "tox>=4.11.0"]
 development_extras = ["black", "isort", "flake8", "pre-commit"]
 
 setup(
     name="wagtail-jotform",
     version=__version__,
-    packages=find_packages(exclude=["tests*"]),
+    packages=find_packages(exclude=["tests*", "benchmarks*"]),
     include_package_data=True,
     description="Embed Jotform forms in wagtail.",
     long_description=long_description,
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+
+from .settings import DEFAULT_ACCOUNT, current_account, wagtail_jotform_settings
+
+
+def get_account_names():
+    """
+    Return the names of the configured Jotform accounts. The default account
+    uses the top level `API_URL` and `API_KEY` settings.
+    """
+    names = [DEFAULT_ACCOUNT]
+    names += [name for name in wagtail_jotform_settings.ACCOUNTS if name not in names]
+    return names
+
+
+def get_current_account():
+    return current_account.get() or DEFAULT_ACCOUNT
+
+
+@contextmanager
+def using_account(name):
+    """
+    Make the API calls and cache lookups inside the block use the Jotform
+    account `name`. With a `name` of `None`, the current account is kept.
+    """
+    if name is None:
+        yield
+        return
+    token = current_account.set(name)
+    try:
+        yield
+    finally:
+        current_account.reset(token)
+
+
+def account_key(key):
+    """
+    Return `key` scoped to the current account, leaving the keys of the
+    default account as they were before accounts were added.
+    """
+    account = get_current_account()
+    return key if account == DEFAULT_ACCOUNT else f"{key}:{account}"
+
+
+def get_account_for_site(site):
+    if site is None:
+        return DEFAULT_ACCOUNT
+    site_accounts = wagtail_jotform_settings.SITE_ACCOUNTS
+    for key in (site.hostname, site.pk, str(site.pk)):
+        if key in site_accounts:
+            return site_accounts[key]
+    return DEFAULT_ACCOUNT
+
+
+def get_account_for_page(page):
+    return get_account_for_site(page.get_site())
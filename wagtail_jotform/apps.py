@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+
+
+class WagtailJotformAppConfig(AppConfig):
+    name = "wagtail_jotform"
+    label = "wagtail_jotform"
+    verbose_name = "Wagtail Jotform"
+    default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        # Connect the default metrics aggregator and the request recorder
+        from . import metrics, profiling  # noqa: F401
+        from .warmup import start_refresher
+
+        request_started.connect(
+            start_refresher, dispatch_uid="wagtail_jotform_refresher"
+        )
@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+
+from .settings import wagtail_jotform_settings
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.1
+
+_local_locks = {}
+_local_locks_lock = threading.Lock()
+
+_refresh_executor = None
+_pending_refreshes = set()
+
+
+class LocalCache:
+    """
+    A per-process, size-bounded LRU cache of values read from the Django cache.
+
+    Each value is stored with the version of the shared value it was read at,
+    and is only returned while that version is current and its TTL hasn't
+    passed.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            try:
+                entry_version, expires_at, value = self._entries[key]
+            except KeyError:
+                return None
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, version, value):
+        expires_at = time.monotonic() + wagtail_jotform_settings.LOCAL_CACHE_TTL
+        with self._lock:
+            self._entries[key] = (version, expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > wagtail_jotform_settings.LOCAL_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache()
+
+
+def _version_key(key):
+    return f"{key}:version"
+
+
+def get_cached(key):
+    """
+    Return the value of `key` in the Django cache, or `None`.
+
+    Only the small version key is read from the shared cache while this
+    process holds the current version of the value.
+    """
+    version = cache.get(_version_key(key))
+    if version is not None and (value := local_cache.get(key, version)) is not None:
+        return value
+
+    value = cache.get(key)
+    if value is not None and version is not None:
+        local_cache.set(key, version, value)
+    return value
+
+
+def set_cached(key, value, timeout):
+    """
+    Set `key` in the Django cache, and bump its version so other processes
+    read the new value instead of their local copy.
+    """
+    version = uuid.uuid4().hex
+    cache.set(key, value, timeout=timeout)
+    cache.set(_version_key(key), version, timeout=timeout)
+    local_cache.set(key, version, value)
+
+
+def _get_local_lock(key):
+    with _local_locks_lock:
+        return _local_locks.setdefault(key, threading.Lock())
+
+
+def _acquire_lock(lock_key, token):
+    return cache.add(
+        lock_key, token, timeout=wagtail_jotform_settings.REFRESH_LOCK_TIMEOUT
+    )
+
+
+def _release_lock(lock_key, token):
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def single_flight(key, get, fetch):
+    """
+    Return `get()`, calling `fetch()` to fill the cache when it returns `None`.
+
+    Concurrent misses are coalesced so only one caller per deployment runs
+    `fetch`: threads in this process queue on a local lock, and processes
+    compete for a lock in the Django cache. Callers that lose wait for the
+    winner to fill the cache and reuse its result.
+    """
+    if (value := get()) is not None:
+        return value
+
+    with _get_local_lock(key):
+        # Another thread may have filled the cache while we waited.
+        if (value := get()) is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wagtail_jotform_settings.REFRESH_WAIT_TIMEOUT
+        while not (acquired := _acquire_lock(lock_key, token)):
+            if time.monotonic() >= deadline:
+                # The other process is slow or has died, fetch without the
+                # lock rather than block the request any longer.
+                break
+            time.sleep(POLL_INTERVAL)
+            if (value := get()) is not None:
+                return value
+
+        try:
+            # The previous holder may have filled the cache just before
+            # releasing the lock.
+            if acquired and (value := get()) is not None:
+                return value
+            return fetch()
+        finally:
+            if acquired:
+                _release_lock(lock_key, token)
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    with _local_locks_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=wagtail_jotform_settings.CHOICES_REFRESH_CONCURRENCY,
+                thread_name_prefix="wagtail_jotform_refresh",
+            )
+        return _refresh_executor
+
+
+def _refresh(key, fetch):
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    try:
+        # Skip the refresh if another process is already running it.
+        if _acquire_lock(lock_key, token):
+            try:
+                fetch()
+            finally:
+                _release_lock(lock_key, token)
+    except Exception:
+        logger.exception(f"Background refresh of {key} failed")
+    finally:
+        with _local_locks_lock:
+            _pending_refreshes.discard(key)
+
+
+def refresh_in_background(key, fetch):
+    """
+    Run `fetch()` in a background thread to refresh the cached value of `key`.
+
+    Nothing is scheduled if a refresh of `key` is already pending in this
+    process, and the refresh is skipped if one is running in another process.
+    Returns the scheduled future, or `None`.
+    """
+    with _local_locks_lock:
+        if key in _pending_refreshes:
+            return None
+        _pending_refreshes.add(key)
+    return _get_refresh_executor().submit(_refresh, key, fetch)
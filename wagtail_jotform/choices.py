@@ -0,0 +1,171 @@
+import struct
+import zlib
+from collections.abc import Sequence
+
+from .settings import wagtail_jotform_settings
+
+FORMAT_VERSION = 1
+MAGIC = b"JFC"
+HEADER = struct.Struct("!3sBBII")  # Magic, version, flags, count, ids length
+HEADER_SIZE = HEADER.size
+COMPRESSED = 1
+SEPARATOR = "\x00"
+
+
+def _clean(value):
+    return str(value).replace(SEPARATOR, "")
+
+
+class FormChoices(Sequence):
+    """
+    A sequence of `(id, title)` form choices, stored in the cache in a compact,
+    versioned encoding rather than as a pickled list of tuples.
+
+    The ids and titles are encoded as two columns of separated strings, and
+    compressed with zlib when larger than `CHOICES_COMPRESS_THRESHOLD` bytes.
+    Decoding is lazy: the count is read from the header, `has_id` searches the
+    encoded ids, and the titles are only split out when they are needed.
+    """
+
+    def __init__(self, choices=()):
+        self._payload = None
+        self._compressed = False
+        self._body = None
+        self._count = None
+        self._ids_length = None
+        self._ids = []
+        self._titles = []
+        for form_id, title in choices:
+            self._ids.append(_clean(form_id))
+            self._titles.append(_clean(title))
+        self._count = len(self._ids)
+
+    @classmethod
+    def decode(cls, payload):
+        """
+        Return the `FormChoices` encoded in `payload`, without decoding its
+        columns. Raises `ValueError` if the payload isn't in a known format.
+        """
+        try:
+            magic, version, flags, count, ids_length = HEADER.unpack_from(payload)
+        except struct.error as e:
+            raise ValueError("Invalid form choices payload") from e
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported form choices format {version}")
+
+        choices = cls.__new__(cls)
+        choices._payload = payload
+        choices._compressed = bool(flags & COMPRESSED)
+        choices._body = None
+        choices._count = count
+        choices._ids_length = ids_length
+        choices._ids = None
+        choices._titles = None
+        return choices
+
+    def encode(self):
+        if self._payload is None:
+            ids = (
+                f"{SEPARATOR}{SEPARATOR.join(self.ids)}{SEPARATOR}".encode()
+                if self._count
+                else b""
+            )
+            body = ids + SEPARATOR.join(self.titles).encode()
+            flags = 0
+            threshold = wagtail_jotform_settings.CHOICES_COMPRESS_THRESHOLD
+            if threshold is not None and len(body) > threshold:
+                body = zlib.compress(body, 1)
+                flags |= COMPRESSED
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, self._count, len(ids))
+            self._payload = header + body
+        return self._payload
+
+    def __reduce__(self):
+        return (self.__class__.decode, (self.encode(),))
+
+    def _get_body(self):
+        if self._body is None:
+            body = self._payload[HEADER_SIZE:]
+            self._body = zlib.decompress(body) if self._compressed else body
+        return self._body
+
+    def _release_body(self):
+        # Once both columns are decoded the body is no longer needed
+        if self._ids is not None and self._titles is not None:
+            self._body = None
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            ids_length = self._ids_length
+            ids = self._get_body()[:ids_length]
+            self._ids = ids[1:-1].decode().split(SEPARATOR) if self._count else []
+            self._release_body()
+        return self._ids
+
+    @property
+    def titles(self):
+        if self._titles is None:
+            ids_length = self._ids_length
+            titles = self._get_body()[ids_length:]
+            self._titles = titles.decode().split(SEPARATOR) if self._count else []
+            self._release_body()
+        return self._titles
+
+    def has_id(self, form_id):
+        form_id = str(form_id)
+        if self._ids is not None:
+            return form_id in self._ids
+        if SEPARATOR in form_id:
+            return False
+        # Each encoded id is surrounded by separators
+        needle = f"{SEPARATOR}{form_id}{SEPARATOR}".encode()
+        return self._get_body().find(needle, 0, self._ids_length) != -1
+
+    def get_title(self, form_id):
+        try:
+            return self.titles[self.ids.index(str(form_id))]
+        except ValueError:
+            return None
+
+    def search(self, query):
+        """
+        Return the choices with a title containing `query` or an id starting
+        with it, with titles starting with `query` listed first.
+        """
+        query = query.casefold()
+        prefix_matches = []
+        substring_matches = []
+        ids = self.ids
+        for index, title in enumerate(self.titles):
+            folded_title = title.casefold()
+            if folded_title.startswith(query):
+                prefix_matches.append((ids[index], title))
+            elif query in folded_title or ids[index].startswith(query):
+                substring_matches.append((ids[index], title))
+        return prefix_matches + substring_matches
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.ids[index], self.titles[index]))
+        return (self.ids[index], self.titles[index])
+
+    def __iter__(self):
+        return zip(self.ids, self.titles)
+
+    def __eq__(self, other):
+        if isinstance(other, (FormChoices, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"<FormChoices: {len(self)} forms>"
+
+
+def as_form_choices(choices):
+    if isinstance(choices, FormChoices):
+        return choices
+    return FormChoices(choices)
@@ -0,0 +1,251 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+from .settings import DEFAULT_ACCOUNT, current_account, wagtail_jotform_settings
+from .signals import api_call_finished
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+LIMIT_LEFT_PATTERN = re.compile(rb'"limit-left"\s*:\s*"?(\d+)')
+ID_PATTERN = re.compile(r"/\d+(?=/|$)")
+
+
+def get_endpoint(url):
+    """
+    Return the path of `url` with ids replaced, e.g. `/form/{id}/properties`,
+    to group API calls by endpoint.
+    """
+    return ID_PATTERN.sub("/{id}", urlsplit(url).path)
+
+
+def _read_limit_left(content):
+    # `limit-left` is at the top level of the body, after the content
+    index = content.rfind(b'"limit-left"')
+    if index == -1:
+        return None
+    match = LIMIT_LEFT_PATTERN.match(content, index)
+    return int(match[1]) if match else None
+
+
+class CircuitOpen(RequestException):
+    """
+    Raised instead of making a request while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stop calling the Jotform API after `CIRCUIT_FAILURE_THRESHOLD` consecutive
+    failures.
+
+    The state is kept in the Django cache so every process shares it. While the
+    circuit is open, requests fail immediately. After `CIRCUIT_RESET_TIMEOUT`
+    seconds a single probe request is let through, and the circuit closes
+    again if it succeeds.
+    """
+
+    def __init__(self, name="default"):
+        prefix = f"wagtail_jotform:circuit:{name}"
+        self.failures_key = f"{prefix}:failures"
+        self.opened_at_key = f"{prefix}:opened_at"
+        self.probe_key = f"{prefix}:probe"
+
+    def is_open(self):
+        return cache.get(self.opened_at_key) is not None
+
+    def before_request(self):
+        if (opened_at := cache.get(self.opened_at_key)) is None:
+            return
+        reset_timeout = wagtail_jotform_settings.CIRCUIT_RESET_TIMEOUT
+        if time.time() < opened_at + reset_timeout:
+            raise CircuitOpen("The Jotform API circuit breaker is open")
+        # Only let one request at a time probe whether the API has recovered
+        if not cache.add(self.probe_key, True, timeout=reset_timeout):
+            raise CircuitOpen("The Jotform API circuit breaker is open")
+
+    def record_success(self):
+        cache.delete_many([self.failures_key, self.opened_at_key, self.probe_key])
+
+    def record_failure(self):
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+            cache.set(self.failures_key, failures, timeout=None)
+        if failures >= wagtail_jotform_settings.CIRCUIT_FAILURE_THRESHOLD:
+            cache.set(self.opened_at_key, time.time(), timeout=None)
+            cache.delete(self.probe_key)
+
+
+class JotFormClient:
+    """
+    A keep-alive HTTP client for the Jotform API.
+
+    Requests share a single pooled `requests.Session`, so connections to the
+    API are reused between calls, and responses with a status in
+    `RETRY_STATUSES` are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        pool_size=None,
+        retries=None,
+        backoff_factor=None,
+        timeout=None,
+        endpoint_timeouts=None,
+        account=DEFAULT_ACCOUNT,
+    ):
+        self.account = account
+        self.pool_size = pool_size or wagtail_jotform_settings.POOL_SIZE
+        self.retries = (
+            retries if retries is not None else wagtail_jotform_settings.RETRIES
+        )
+        self.backoff_factor = (
+            backoff_factor
+            if backoff_factor is not None
+            else wagtail_jotform_settings.BACKOFF_FACTOR
+        )
+        self.timeout = timeout or wagtail_jotform_settings.TIMEOUT
+        self.endpoint_timeouts = (
+            endpoint_timeouts
+            if endpoint_timeouts is not None
+            else wagtail_jotform_settings.ENDPOINT_TIMEOUTS
+        )
+        self.pid = os.getpid()
+        self.session = self._build_session()
+        self.circuit_breaker = CircuitBreaker(account)
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.retries,
+            # Don't resend requests that may have reached the server, the status
+            # retries below cover the cases where the API asks us to try again.
+            read=0,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_timeout(self, url):
+        path = urlsplit(url).path
+        for endpoint, timeout in self.endpoint_timeouts.items():
+            if endpoint in path:
+                return timeout
+        return self.timeout
+
+    def request(self, method, url, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.get_timeout(url)
+
+        start = time.perf_counter()
+        try:
+            response = self._request(method, url, timeout, **kwargs)
+        except RequestException as e:
+            self._send_finished(method, url, start, type(e).__name__)
+            raise
+
+        if kwargs.get("stream"):
+            # Reading the body here would defeat streaming
+            length = response.headers.get("Content-Length")
+            size = int(length) if length and length.isdigit() else None
+            limit_left = None
+        else:
+            size = len(response.content)
+            limit_left = _read_limit_left(response.content)
+        self._send_finished(method, url, start, response.status_code, size, limit_left)
+        return response
+
+    def _request(self, method, url, timeout, **kwargs):
+        self.circuit_breaker.before_request()
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except RequestException:
+            self.circuit_breaker.record_failure()
+            raise
+
+        if response.status_code in RETRY_STATUSES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def _send_finished(self, method, url, start, status, size=None, limit_left=None):
+        api_call_finished.send(
+            sender=self.__class__,
+            account=self.account,
+            method=method,
+            url=url,
+            endpoint=get_endpoint(url),
+            status=status,
+            duration=time.perf_counter() - start,
+            size=size,
+            limit_left=limit_left,
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the `JotFormClient` of the current account for this process,
+    creating it on first use. Each account has its own connection pool and
+    circuit breaker, so an outage of one account doesn't affect the others.
+
+    The pid is checked so that workers forked from a preloaded parent don't
+    share the parent's connection pool.
+    """
+    account = current_account.get() or DEFAULT_ACCOUNT
+    client = _clients.get(account)
+    if client is None or client.pid != os.getpid():
+        with _client_lock:
+            client = _clients.get(account)
+            if client is None or client.pid != os.getpid():
+                client = _clients[account] = JotFormClient(account=account)
+    return client
+
+
+def reset_client():
+    with _client_lock:
+        for client in _clients.values():
+            if client.pid == os.getpid():
+                client.close()
+        _clients.clear()
+
+
+@receiver(setting_changed)
+def reset_client_on_setting_changed(*, setting, **kwargs):
+    if setting == "WAGTAIL_JOTFORM":
+        reset_client()
@@ -0,0 +1,103 @@
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import JotFormSubmission, JotFormSubmissionSyncState
+from .settings import wagtail_jotform_settings
+from .sync import format_jotform_datetime, iter_submission_pages, parse_jotform_datetime
+from .utils import INTERACTIVE
+
+EXPORT_FIELDS = ["submission_id", "created_at", "status", "answers"]
+
+_DONE = object()
+
+
+class _Echo:
+    # A file-like object whose `write` returns the line for `csv.writer`
+    def write(self, value):
+        return value
+
+
+def prefetch(iterable):
+    """
+    Yield the items of `iterable`, fetching the next item in a thread while
+    the current one is being consumed.
+    """
+    iterator = iter(iterable)
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="wagtail_jotform_export"
+    ) as executor:
+        future = executor.submit(next, iterator, _DONE)
+        while (item := future.result()) is not _DONE:
+            future = executor.submit(next, iterator, _DONE)
+            yield item
+
+
+def _flatten_answers(answers):
+    # API answers are keyed by question id, with the question's name and answer
+    flattened = {}
+    for key, value in answers.items():
+        if isinstance(value, dict):
+            if "answer" in value:
+                flattened[value.get("name") or key] = value["answer"]
+        else:
+            flattened[key] = value
+    return flattened
+
+
+def _row(submission_id, created_at, status, answers):
+    return {
+        "submission_id": submission_id,
+        "created_at": format_jotform_datetime(created_at) if created_at else "",
+        "status": status,
+        "answers": _flatten_answers(answers or {}),
+    }
+
+
+def iter_submission_rows(form_id, account=None):
+    """
+    Yield a dict for each submission to `form_id`, oldest first.
+
+    Submissions are read from the `JotFormSubmission` table once the form's
+    submissions have been synced. Submissions stored by the webhook alone
+    don't count, as older submissions would be missing. Otherwise they're
+    read from the API, at interactive priority as an editor is waiting,
+    fetching the next page while the current one is being exported.
+    """
+    if JotFormSubmissionSyncState.objects.filter(form_id=form_id).exists():
+        submissions = JotFormSubmission.objects.filter(form_id=form_id)
+        rows = submissions.order_by("created_at", "pk").values_list(
+            "submission_id", "created_at", "status", "answers"
+        )
+        for row in rows.iterator(chunk_size=wagtail_jotform_settings.SYNC_BATCH_SIZE):
+            yield _row(*row)
+        return
+
+    pages = iter_submission_pages(form_id, account=account, priority=INTERACTIVE)
+    for page in prefetch(pages):
+        for item in page:
+            yield _row(
+                item["id"],
+                parse_jotform_datetime(item.get("created_at")),
+                item.get("status", ""),
+                item.get("answers"),
+            )
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row["answers"] = json.dumps(row["answers"])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", iter_csv),
+    "jsonl": ("application/x-ndjson", iter_jsonl),
+}
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail_jotform.sync import sync_submissions
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy new submissions to Jotform forms into the local JotFormSubmission table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "form_ids",
+            nargs="*",
+            help="Forms to sync. Defaults to the forms used by embedded form pages.",
+        )
+
+    def handle(self, *args, **options):
+        counts, errors = sync_submissions(options["form_ids"] or None)
+
+        for form_id, count in counts.items():
+            if form_id not in errors:
+                self.stdout.write(f"{form_id}: {count} submissions fetched.")
+        for form_id, error in errors.items():
+            self.stderr.write(f"{form_id}: {error}")
+        if errors:
+            raise CommandError(f"Failed to sync {len(errors)} forms.")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail_jotform.sync import sync_forms
+from wagtail_jotform.utils import CantPullFromAPI
+
+
+class Command(BaseCommand):
+    help = "Copy the forms in the Jotform account into the local JotForm table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Fetch every form rather than only those updated since the last sync.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            created, updated, deleted = sync_forms(full=options["full"])
+        except CantPullFromAPI as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{created} forms created, {updated} updated, {deleted} deleted."
+            )
+        )
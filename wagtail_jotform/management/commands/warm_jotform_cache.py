@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail_jotform.accounts import get_account_names
+from wagtail_jotform.warmup import warm_form_choices
+
+
+class Command(BaseCommand):
+    help = "Fetch the form choices of every Jotform account and fill their caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "accounts",
+            nargs="*",
+            help="Accounts to warm. Defaults to every configured account.",
+        )
+
+    def handle(self, *args, **options):
+        accounts = options["accounts"]
+        if unknown := [name for name in accounts if name not in get_account_names()]:
+            raise CommandError(f"Unknown accounts: {', '.join(unknown)}")
+
+        results = warm_form_choices(accounts or None)
+
+        errors = 0
+        for account, result in results.items():
+            if isinstance(result, Exception):
+                errors += 1
+                self.stderr.write(f"{account}: {result}")
+            else:
+                self.stdout.write(f"{account}: {result} form choices cached.")
+        if errors:
+            raise CommandError(f"Failed to warm {errors} accounts.")
@@ -0,0 +1,85 @@
+import copy
+import threading
+from collections import Counter
+
+from django.dispatch import receiver
+
+from .signals import api_call_finished, cache_accessed, publish_outcome
+
+
+class MetricsAggregator:
+    """
+    Per-process totals of the events sent by `wagtail_jotform.signals`, for
+    tests, admin views and exporters to read with `snapshot`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._api_calls = {}
+            self._cache = Counter()
+            self._publish = Counter()
+            self._limit_left = None
+
+    def record_api_call(self, method, endpoint, status, duration, size, limit_left):
+        with self._lock:
+            stats = self._api_calls.setdefault(
+                f"{method} {endpoint}",
+                {
+                    "count": 0,
+                    "statuses": Counter(),
+                    "total_duration": 0.0,
+                    "max_duration": 0.0,
+                    "bytes": 0,
+                },
+            )
+            stats["count"] += 1
+            stats["statuses"][str(status)] += 1
+            stats["total_duration"] += duration
+            stats["max_duration"] = max(stats["max_duration"], duration)
+            stats["bytes"] += size or 0
+            if limit_left is not None:
+                self._limit_left = limit_left
+
+    def record_cache(self, key, result):
+        with self._lock:
+            self._cache[f"{key}:{result}"] += 1
+
+    def record_publish(self, outcome, duration):
+        with self._lock:
+            self._publish[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            api_calls = copy.deepcopy(self._api_calls)
+            for stats in api_calls.values():
+                stats["statuses"] = dict(stats["statuses"])
+            return {
+                "api_calls": api_calls,
+                "limit_left": self._limit_left,
+                "cache": dict(self._cache),
+                "publish": dict(self._publish),
+            }
+
+
+metrics = MetricsAggregator()
+
+
+@receiver(api_call_finished)
+def record_api_call(
+    sender, method, endpoint, status, duration, size, limit_left, **kwargs
+):
+    metrics.record_api_call(method, endpoint, status, duration, size, limit_left)
+
+
+@receiver(cache_accessed)
+def record_cache(sender, key, result, **kwargs):
+    metrics.record_cache(key, result)
+
+
+@receiver(publish_outcome)
+def record_publish(sender, outcome, duration=None, **kwargs):
+    metrics.record_publish(outcome, duration)
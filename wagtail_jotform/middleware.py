@@ -0,0 +1,37 @@
+from .profiling import record_calls
+from .settings import wagtail_jotform_settings
+
+
+def _server_timing(recorder):
+    metrics = []
+    for kind, description in (("api", "Jotform API"), ("publish", "Jotform push")):
+        if calls := recorder.get_calls(kind):
+            duration = recorder.get_total_duration(kind) * 1000
+            metrics.append(
+                f'jotform-{kind};dur={duration:.1f};desc="{description} ({len(calls)})"'
+            )
+    for call in recorder.get_calls("cache"):
+        metrics.append(f'jotform-cache;desc="Form choices {call["source"]}"')
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Record the Jotform calls made by each request while `PROFILE_REQUESTS` is
+    set, and report them in a `Server-Timing` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wagtail_jotform_settings.PROFILE_REQUESTS:
+            return self.get_response(request)
+
+        with record_calls() as recorder:
+            response = self.get_response(request)
+        if header := _server_timing(recorder):
+            if existing := response.get("Server-Timing"):
+                header = f"{existing}, {header}"
+            response["Server-Timing"] = header
+        return response
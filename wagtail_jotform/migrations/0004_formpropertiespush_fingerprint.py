@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wagtail_jotform", "0003_formpropertiespush"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formpropertiespush",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                help_text="A hash of the form id and properties last pushed successfully",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="formpropertiespush",
+            name="form",
+            field=models.CharField(
+                blank=True,
+                help_text="The form last pushed to successfully",
+                max_length=1000,
+            ),
+        ),
+    ]
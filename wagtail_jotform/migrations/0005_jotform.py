@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wagtail_jotform", "0004_formpropertiespush_fingerprint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JotForm",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("form_id", models.CharField(max_length=1000, unique=True)),
+                ("title", models.CharField(db_index=True, max_length=1000)),
+                (
+                    "status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("ENABLED", "Enabled"),
+                            ("DISABLED", "Disabled"),
+                            ("DELETED", "Deleted"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("url", models.URLField(blank=True, max_length=1000)),
+                ("height", models.PositiveIntegerField(blank=True, null=True)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "updated_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("synced_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Jotform form",
+                "ordering": ["title"],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wagtail_jotform", "0005_jotform"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JotFormSubmissionSyncState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("form_id", models.CharField(max_length=1000, unique=True)),
+                ("last_created_at", models.DateTimeField(blank=True, null=True)),
+                ("synced_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="JotFormSubmission",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("submission_id", models.CharField(max_length=100, unique=True)),
+                ("form_id", models.CharField(max_length=1000)),
+                ("status", models.CharField(blank=True, max_length=20)),
+                ("ip", models.CharField(blank=True, max_length=100)),
+                ("answers", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Jotform submission",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["form_id", "created_at"],
+                        name="wagtail_jot_form_id_642155_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wagtail_jotform", "0006_jotformsubmission"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="embeddedformpage",
+            name="embed_mode",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("script", "Script (loads with the page)"),
+                    ("iframe", "Lazy iframe"),
+                    ("facade", "Load on click"),
+                    ("scroll", "Load when scrolled into view"),
+                ],
+                help_text="How the form is loaded. Leave blank to use the site default.",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wagtail_jotform", "0007_embeddedformpage_embed_mode"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="embeddedformpage",
+            name="embed_mode",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("script", "Script (loads with the page)"),
+                    ("iframe", "Lazy iframe"),
+                    ("facade", "Load on click"),
+                    ("scroll", "Load when scrolled into view"),
+                    ("native", "Native HTML form"),
+                ],
+                help_text="How the form is loaded. Leave blank to use the site default.",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -1,43 +1,244 @@
-from django.core.cache import cache
+import time
+
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.forms.widgets import Select
+from django.db.models import Case, IntegerField, Q, Value, When
 from django.shortcuts import render
 
 from wagtail.admin.forms import WagtailAdminPageForm
-from wagtail.admin.panels import FieldPanel
+from wagtail.admin.panels import FieldPanel, HelpPanel
 from wagtail.contrib.routable_page.models import RoutablePageMixin, route
 from wagtail.fields import RichTextField
 from wagtail.models import Page
 
+from .accounts import (
+    DEFAULT_ACCOUNT,
+    account_key,
+    get_account_for_page,
+    get_current_account,
+    using_account,
+)
+from .cache import get_cached, refresh_in_background, set_cached, single_flight
+from .choices import as_form_choices
+from .page_cache import cache_page_response
+from .profiling import in_current_context
 from .settings import wagtail_jotform_settings
-from .utils import JotFormAPI
+from .signals import cache_accessed
+from .utils import CantPullFromAPI, JotFormAPI
+from .widgets import JotFormChooser
+
+# Versioned, as older releases stored a plain list under `jot_form_choices`
+CHOICES_CACHE_KEY = "jot_form_choices:v2"
+
+
+def get_choices_cache_key():
+    return account_key(CHOICES_CACHE_KEY)
+
+
+def _fetch_form_choices(raise_on_error=False):
+    form_choices = []
+    failed = False
+    soft_ttl = wagtail_jotform_settings.CHOICES_SOFT_TTL
+    hard_ttl = wagtail_jotform_settings.CHOICES_HARD_TTL
+    if wagtail_jotform_settings.API_URL and wagtail_jotform_settings.API_KEY:
+        if wagtail_jotform_settings.STREAM_RESPONSES:
+            forms = JotFormAPI().get_forms(fields=("id", "title"))
+        else:
+            forms = JotFormAPI().get_data().get("content")
+        if forms is not None:
+            for item in forms:
+                form_choices.append((item["id"], item["title"]))
+        else:
+            # The API couldn't be reached. Keep serving any stale choices, and
+            # try again after the shorter negative TTL.
+            failed = True
+            soft_ttl = wagtail_jotform_settings.CHOICES_NEGATIVE_TTL
+            if (stale_choices := _get_cached_choices()) is not None:
+                form_choices = stale_choices
+            else:
+                hard_ttl = soft_ttl
+
+    # Cache the choices until the hard TTL, but mark them for a refresh once
+    # the soft TTL has passed. They're pickled in the compact `FormChoices`
+    # encoding.
+    form_choices = as_form_choices(form_choices)
+    entry = {"choices": form_choices, "refresh_at": time.time() + soft_ttl}
+    set_cached(get_choices_cache_key(), entry, timeout=hard_ttl)
+    if failed and raise_on_error:
+        raise CantPullFromAPI("Couldn't fetch the form choices")
+    return form_choices
+
 
+def _get_choices_entry(key):
+    """
+    Return the cached choices entry under `key`, or `None` if there isn't one
+    or it was written by an incompatible version, so the choices are refetched.
+    """
+    try:
+        entry = get_cached(key)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or "refresh_at" not in entry:
+        return None
+    return entry
 
-CHOICES_CACHE_KEY = "jot_form_choices"
+
+def _get_cached_choices():
+    if (entry := _get_choices_entry(get_choices_cache_key())) is None:
+        return None
+    return entry["choices"]
 
 
 def jot_form_choices():
+    if _use_synced_forms():
+        return list(
+            JotForm.objects.exclude(status=JotForm.Status.DELETED).values_list(
+                "form_id", "title"
+            )
+        )
+
+    key = get_choices_cache_key()
     # Use a `None` check to allow empty choices to still be cached
-    if (form_choices := cache.get(CHOICES_CACHE_KEY)) is None:
+    if (entry := _get_choices_entry(key)) is not None:
+        if entry["refresh_at"] <= time.time():
+            # Serve the stale choices and refresh them in the background, for
+            # the same account
+            cache_accessed.send(sender=None, key=key, result="stale")
+            refresh_in_background(key, in_current_context(_fetch_form_choices))
+        else:
+            cache_accessed.send(sender=None, key=key, result="hit")
+        return entry["choices"]
 
-        form_choices = []
-        if wagtail_jotform_settings.API_URL and wagtail_jotform_settings.API_KEY:
-            jotform = JotFormAPI()
-            jotform.fetch_from_api()
-            data = jotform.get_data()
-            if "content" in data:
-                for item in data["content"]:
-                    form_choices.append((item["id"], item["title"]))
+    cache_accessed.send(sender=None, key=key, result="miss")
+    return single_flight(key, _get_cached_choices, _fetch_form_choices)
 
-        cache.set(CHOICES_CACHE_KEY, form_choices, timeout=300)
 
-    return form_choices
+def _use_synced_forms():
+    # The `JotForm` table only holds the forms of the default account
+    return (
+        wagtail_jotform_settings.SYNC_FORMS
+        and get_current_account() == DEFAULT_ACCOUNT
+        and JotForm.objects.exists()
+    )
+
+
+def search_form_choices(query="", page=1, per_page=None):
+    """
+    Return a page of `(id, title)` form choices matching `query`, and whether
+    there are more pages.
+
+    Forms are matched on a substring of their title or a prefix of their id,
+    with titles starting with `query` listed first.
+    """
+    per_page = per_page or wagtail_jotform_settings.CHOOSER_PAGE_SIZE
+    start = (page - 1) * per_page
+    end = start + per_page + 1  # Fetch one more to tell if there's a next page
+
+    if _use_synced_forms():
+        forms = JotForm.objects.exclude(status=JotForm.Status.DELETED)
+        if query:
+            forms = (
+                forms.filter(Q(title__icontains=query) | Q(form_id__startswith=query))
+                .annotate(
+                    rank=Case(
+                        When(title__istartswith=query, then=Value(0)),
+                        default=Value(1),
+                        output_field=IntegerField(),
+                    )
+                )
+                .order_by("rank", "title")
+            )
+        results = list(forms.values_list("form_id", "title")[start:end])
+    else:
+        choices = as_form_choices(jot_form_choices())
+        if query:
+            results = choices.search(query)[start:end]
+        else:
+            results = choices[start:end]
+
+    return results[:per_page], len(results) > per_page
+
+
+def get_form_choice_title(form_id):
+    if _use_synced_forms():
+        return (
+            JotForm.objects.filter(form_id=form_id)
+            .values_list("title", flat=True)
+            .first()
+        )
+    return as_form_choices(jot_form_choices()).get_title(form_id)
+
+
+def form_choice_exists(form_id):
+    """
+    Return whether `form_id` is a form in the Jotform account. If the list of
+    forms can't be loaded, any id is allowed so editors aren't blocked.
+    """
+    if _use_synced_forms():
+        forms = JotForm.objects.exclude(status=JotForm.Status.DELETED)
+        return forms.filter(form_id=form_id).exists()
+    choices = as_form_choices(jot_form_choices())
+    return not choices or choices.has_id(form_id)
+
+
+class JotForm(models.Model):
+    """
+    A local copy of a form in the Jotform account, kept up to date by
+    `sync.sync_forms` or the `sync_jotforms` management command.
+    """
+
+    class Status(models.TextChoices):
+        ENABLED = "ENABLED", "Enabled"
+        DISABLED = "DISABLED", "Disabled"
+        DELETED = "DELETED", "Deleted"
+
+    form_id = models.CharField(max_length=1000, unique=True)
+    title = models.CharField(max_length=1000, db_index=True)
+    status = models.CharField(max_length=20, blank=True, choices=Status.choices)
+    url = models.URLField(max_length=1000, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["title"]
+        verbose_name = "Jotform form"
+
+    def __str__(self):
+        return self.title
 
 
 class EmbeddedFormPageAdminForm(WagtailAdminPageForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["form"].widget.choices = jot_form_choices()
+        # New pages don't have a site yet, so use their parent's
+        page = self.instance if self.instance.pk else self.parent_page
+        self.jotform_account = (
+            get_account_for_page(page) if page is not None else DEFAULT_ACCOUNT
+        )
+        if "form" in self.fields:
+            self.fields["form"].widget.account = self.jotform_account
+
+    def clean_form(self):
+        form_id = self.cleaned_data["form"]
+        # Allow pages to be saved with their current form, even if it has since
+        # been deleted from Jotform.
+        if form_id == self.initial.get("form"):
+            return form_id
+        with using_account(self.jotform_account):
+            if not form_choice_exists(form_id):
+                raise ValidationError("Choose a form from your Jotform account.")
+        return form_id
+
+
+class EmbedMode(models.TextChoices):
+    SCRIPT = "script", "Script (loads with the page)"
+    IFRAME = "iframe", "Lazy iframe"
+    FACADE = "facade", "Load on click"
+    SCROLL = "scroll", "Load when scrolled into view"
+    NATIVE = "native", "Native HTML form"
 
 
 class EmbeddedFormPage(RoutablePageMixin, Page):
@@ -49,6 +250,12 @@ class EmbeddedFormPage(RoutablePageMixin, Page):
 
     introduction = models.TextField(blank=True)
     form = models.CharField(max_length=1000)
+    embed_mode = models.CharField(
+        max_length=20,
+        choices=EmbedMode.choices,
+        blank=True,
+        help_text="How the form is loaded. Leave blank to use the site default.",
+    )
     thank_you_text = RichTextField(
         blank=True,
         help_text="Text displayed to the user on successful submission of the form",
@@ -58,8 +265,99 @@ class EmbeddedFormPage(RoutablePageMixin, Page):
     def thank_you_page(self, request, *args, **kwargs):
         return render(request, self.thank_you_template, {"page": self})
 
+    def serve(self, request, view=None, args=None, kwargs=None):
+        route = view.__name__ if view else "index_route"
+        return cache_page_response(
+            self,
+            request,
+            route,
+            lambda: super(EmbeddedFormPage, self).serve(request, view, args, kwargs),
+        )
+
+    def get_jotform_account(self):
+        return get_account_for_page(self)
+
+    def get_embed_mode(self):
+        return self.embed_mode or wagtail_jotform_settings.EMBED_MODE
+
     content_panels = Page.content_panels + [
         FieldPanel("introduction"),
-        FieldPanel("form", widget=Select(choices=[])),
+        FieldPanel("form", widget=JotFormChooser()),
+        FieldPanel("embed_mode"),
+        HelpPanel(
+            template="wagtail_jotform/panels/properties_push.html",
+            heading="Jotform thank you URL",
+        ),
         FieldPanel("thank_you_text"),
     ]
+
+
+class FormPropertiesPush(models.Model):
+    """
+    The outcome of the last push of an `EmbeddedFormPage`'s thank you URL to
+    its Jotform form, shown to editors in the page editor.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    page = models.OneToOneField(
+        EmbeddedFormPage, on_delete=models.CASCADE, related_name="properties_push"
+    )
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    form = models.CharField(
+        max_length=1000, blank=True, help_text="The form last pushed to successfully"
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="A hash of the form id and properties last pushed successfully",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.page}: {self.get_status_display()}"
+
+
+class JotFormSubmission(models.Model):
+    """
+    A local copy of a submission to a Jotform form, kept up to date by
+    `sync.sync_submissions` or the `sync_jotform_submissions` management
+    command.
+    """
+
+    submission_id = models.CharField(max_length=100, unique=True)
+    form_id = models.CharField(max_length=1000)
+    status = models.CharField(max_length=20, blank=True)
+    ip = models.CharField(max_length=100, blank=True)
+    answers = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["form_id", "created_at"])]
+        verbose_name = "Jotform submission"
+
+    def __str__(self):
+        return self.submission_id
+
+
+class JotFormSubmissionSyncState(models.Model):
+    """
+    The newest submission `created_at` copied for a form, from which the next
+    sync of its submissions resumes.
+    """
+
+    form_id = models.CharField(max_length=1000, unique=True)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.form_id
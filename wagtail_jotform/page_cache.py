@@ -0,0 +1,119 @@
+import logging
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from wagtail.models import Site
+from wagtail.signals import page_unpublished
+
+from .settings import wagtail_jotform_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(page_id):
+    return f"wagtail_jotform:page:{page_id}:version"
+
+
+def get_page_version(page_id):
+    key = _version_key(page_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _is_cacheable(request):
+    user = getattr(request, "user", None)
+    return (
+        request.method in ("GET", "HEAD")
+        and not getattr(request, "is_preview", False)
+        and not (user and user.is_authenticated)
+    )
+
+
+def cache_page_response(page, request, route, render):
+    """
+    Return the response of `render()` for `route` of `page`, caching it for
+    anonymous visitors for `PAGE_CACHE_TIMEOUT` seconds.
+
+    Responses are cached per page, site and route, under the page's current
+    version, so `invalidate_page` drops every cached response of a page at
+    once.
+    """
+    timeout = wagtail_jotform_settings.PAGE_CACHE_TIMEOUT
+    if not timeout or not _is_cacheable(request):
+        return render()
+
+    site = Site.find_for_request(request)
+    version = get_page_version(page.pk)
+    key = f"wagtail_jotform:page:{page.pk}:{site.pk if site else ''}:{route}:{version}"
+    if (cached := cache.get(key)) is not None:
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    response = render()
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    # Don't share responses that are personal to the visitor, such as forms
+    # with a CSRF token
+    if (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    ):
+        cache.set(key, (response.content, response["Content-Type"]), timeout=timeout)
+    return response
+
+
+def purge_frontend_cache(page):
+    if not apps.is_installed("wagtail.contrib.frontend_cache"):
+        logger.error("PURGE_FRONTEND_CACHE is set but frontend_cache is not installed")
+        return
+    from wagtail.contrib.frontend_cache.utils import PurgeBatch
+
+    batch = PurgeBatch()
+    batch.add_page(page)
+    # Wagtail only purges the page itself, not its routes
+    if page.url:
+        batch.add_url(page.full_url + page.reverse_subpage("embedded_form_thank_you"))
+    batch.purge()
+
+
+def invalidate_page(page):
+    """
+    Drop the cached responses of `page`, and purge them from the frontend
+    cache with `PURGE_FRONTEND_CACHE`.
+    """
+    cache.delete(_version_key(page.pk))
+    if wagtail_jotform_settings.PURGE_FRONTEND_CACHE:
+        try:
+            purge_frontend_cache(page)
+        except Exception:
+            logger.exception(f"Failed to purge the frontend cache of page {page.pk}")
+
+
+def _is_embedded_form_page(instance):
+    from .models import EmbeddedFormPage
+
+    return isinstance(instance, EmbeddedFormPage)
+
+
+@receiver(page_unpublished)
+def invalidate_unpublished_page(sender, instance, **kwargs):
+    if _is_embedded_form_page(instance):
+        invalidate_page(instance)
+
+
+# Deleting a subclass of `EmbeddedFormPage` also sends `post_delete` for its
+# `EmbeddedFormPage` row. The sender is lazy as models imports this module.
+@receiver(post_delete, sender="wagtail_jotform.EmbeddedFormPage")
+def invalidate_deleted_page(sender, instance, **kwargs):
+    # The page's URL can no longer be worked out to purge it
+    cache.delete(_version_key(instance.pk))
@@ -0,0 +1,43 @@
+from debug_toolbar.panels import Panel
+
+from .profiling import record_calls
+
+
+class JotFormPanel(Panel):
+    """
+    A django-debug-toolbar panel listing the Jotform API calls, choices cache
+    lookups and properties pushes made by the request.
+    """
+
+    title = "Jotform"
+    template = "wagtail_jotform/debug_toolbar/panel.html"
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        if not stats:
+            return ""
+        return f"{stats['api_count']} API calls in {stats['api_duration']:.1f}ms"
+
+    def process_request(self, request):
+        with record_calls() as recorder:
+            response = super().process_request(request)
+        self._recorder = recorder
+        return response
+
+    def generate_stats(self, request, response):
+        recorder = self._recorder
+        calls = [
+            dict(call, duration=call["duration"] * 1000 if call["duration"] else None)
+            for call in recorder.calls
+        ]
+        self.record_stats(
+            {
+                "calls": calls,
+                "api_count": len(recorder.get_calls("api")),
+                "api_duration": recorder.get_total_duration("api") * 1000,
+                "api_size": sum(
+                    call["size"] or 0 for call in recorder.get_calls("api")
+                ),
+            }
+        )
@@ -0,0 +1,102 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.dispatch import receiver
+
+from .signals import api_call_finished, cache_accessed, publish_outcome
+
+_recorder = contextvars.ContextVar("wagtail_jotform_recorder", default=None)
+
+
+class CallRecorder:
+    """
+    The Jotform API calls, choices cache lookups and properties pushes made
+    while handling a single request.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, **call):
+        with self._lock:
+            self.calls.append(call)
+
+    def get_calls(self, kind):
+        return [call for call in self.calls if call["kind"] == kind]
+
+    def get_total_duration(self, kind):
+        return sum(call["duration"] or 0 for call in self.get_calls(kind))
+
+
+@contextmanager
+def record_calls():
+    """
+    Record the Jotform calls made inside the block, including from threads
+    started with `in_current_context`, into the `CallRecorder` it yields.
+    """
+    recorder = CallRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def get_recorder():
+    return _recorder.get()
+
+
+def in_current_context(func):
+    """
+    Wrap `func` to run in a copy of the current context, so calls it makes
+    from a pool thread are recorded by the request that submitted it.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+@receiver(api_call_finished)
+def record_api_call(sender, method, url, status, duration, size, **kwargs):
+    if (recorder := _recorder.get()) is None:
+        return
+    recorder.add(
+        kind="api",
+        name=f"{method} {url}",
+        source="revalidated" if status == 304 else "api",
+        status=status,
+        duration=duration,
+        size=size,
+    )
+
+
+@receiver(cache_accessed)
+def record_cache(sender, key, result, **kwargs):
+    if (recorder := _recorder.get()) is None:
+        return
+    recorder.add(
+        kind="cache", name=key, source=result, status=None, duration=None, size=None
+    )
+
+
+@receiver(publish_outcome)
+def record_publish(sender, page, outcome, duration=None, **kwargs):
+    if (recorder := _recorder.get()) is None:
+        return
+    recorder.add(
+        kind="publish",
+        name=f"Page {page.pk}",
+        source=outcome,
+        status=None,
+        duration=duration,
+        size=None,
+    )
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.urls import NoReverseMatch, reverse
+from django.utils.module_loading import import_string
+
+from requests.exceptions import HTTPError
+
+from .accounts import get_account_for_page, get_current_account, using_account
+from .client import get_client
+from .models import EmbeddedFormPage, FormPropertiesPush
+from .settings import wagtail_jotform_settings
+from .signals import publish_outcome
+from .utils import CantPullFromAPI, rate_limit_scheduler
+
+logger = logging.getLogger(__name__)
+
+# How long a queued push suppresses further pushes of the same page
+DEDUPE_TIMEOUT = 300
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class FormPushRejected(CantPullFromAPI):
+    """
+    The API answered a push with an HTTP error status, for example because
+    the form has been deleted in Jotform.
+    """
+
+
+def get_thank_you_properties(page):
+    thank_you_url = page.full_url + page.specific.reverse_subpage(
+        "embedded_form_thank_you"
+    )
+    return {
+        "activeRedirect": "thankurl",
+        "thankurl": f"{thank_you_url}",
+    }
+
+
+def get_webhook_url(page):
+    """
+    Return the URL Jotform should send the submissions of `page`'s form to, or
+    `None` if webhooks aren't registered.
+    """
+    secret = wagtail_jotform_settings.WEBHOOK_SECRET
+    if not wagtail_jotform_settings.REGISTER_WEBHOOK or not secret:
+        return None
+    try:
+        path = reverse("wagtail_jotform_webhook")
+    except NoReverseMatch:
+        logger.error("REGISTER_WEBHOOK is set but wagtail_jotform.urls is not included")
+        return None
+    return f"{page.get_site().root_url}{path}?{urlencode({'token': secret})}"
+
+
+def _post_to_form(form_id, endpoint, data):
+    params = (("apiKey", wagtail_jotform_settings.API_KEY),)
+
+    try:
+        response = get_client().post(
+            f"{wagtail_jotform_settings.API_URL}/form/{form_id}/{endpoint}",
+            params=params,
+            data=data,
+        )
+    except Exception as e:
+        raise CantPullFromAPI("Cant post") from e
+    try:
+        response.raise_for_status()
+    except HTTPError as e:
+        raise FormPushRejected("Cant post") from e
+
+    try:
+        rate_limit_scheduler.record(response.json())
+    except ValueError:
+        pass
+
+
+def push_form_properties(form_id, form_properties):
+    properties = {f"properties[{key}]": form_properties[key] for key in form_properties}
+    _post_to_form(form_id, "properties", properties)
+
+
+def register_form_webhook(form_id, webhook_url):
+    _post_to_form(form_id, "webhooks", {"webhookURL": webhook_url})
+
+
+def get_properties_fingerprint(form_id, form_properties, webhook_url=None):
+    # Include the account, so moving a site to another account pushes again
+    fields = [form_id, form_properties, get_current_account()]
+    if webhook_url:
+        fields.append(webhook_url)
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def properties_changed(page):
+    """
+    Return whether the form id, properties or webhook URL of `page` differ from
+    those last pushed to Jotform successfully.
+    """
+    fingerprint = get_properties_fingerprint(
+        page.form, get_thank_you_properties(page), get_webhook_url(page)
+    )
+    return not FormPropertiesPush.objects.filter(
+        page=page, fingerprint=fingerprint
+    ).exists()
+
+
+def push_page_properties(page):
+    """
+    Push the thank you URL of `page` to its Jotform form, and record the
+    outcome on the page's `FormPropertiesPush`.
+
+    If the page has moved to a different form, the redirect on the form it
+    used before is reset. With `REGISTER_WEBHOOK`, the submission webhook is
+    also registered on the form.
+    """
+    form_properties = get_thank_you_properties(page)
+    webhook_url = get_webhook_url(page)
+    push, _ = FormPropertiesPush.objects.get_or_create(page=page)
+    push.attempts += 1
+    start = time.perf_counter()
+    try:
+        push_form_properties(page.form, form_properties)
+        if webhook_url:
+            register_form_webhook(page.form, webhook_url)
+    except CantPullFromAPI as e:
+        push.status = FormPropertiesPush.Status.FAILED
+        push.error = str(e.__cause__ or e)
+        push.save()
+        publish_outcome.send(
+            sender=EmbeddedFormPage,
+            page=page,
+            outcome="failed",
+            duration=time.perf_counter() - start,
+        )
+        raise
+
+    if push.form and push.form != page.form:
+        try:
+            push_form_properties(push.form, {"activeRedirect": "default"})
+        except CantPullFromAPI:
+            logger.exception(f"Failed to reset the redirect of form {push.form}")
+
+    push.status = FormPropertiesPush.Status.SUCCEEDED
+    push.error = ""
+    push.form = page.form
+    push.fingerprint = get_properties_fingerprint(
+        page.form, form_properties, webhook_url
+    )
+    push.save()
+    publish_outcome.send(
+        sender=EmbeddedFormPage,
+        page=page,
+        outcome="succeeded",
+        duration=time.perf_counter() - start,
+    )
+
+
+def _dedupe_key(page_id):
+    return f"wagtail_jotform:properties_push:{page_id}"
+
+
+def run_properties_push(page_id):
+    """
+    Push the properties of the page with `page_id`, retrying failures with
+    exponential backoff. This is what the background backends run.
+    """
+    # Allow the page to be queued again as soon as this push reads it, so that
+    # a publish made while it runs is not lost.
+    cache.delete(_dedupe_key(page_id))
+
+    page = EmbeddedFormPage.objects.filter(pk=page_id).first()
+    if page is None or not page.form:
+        return
+
+    account = get_account_for_page(page)
+    retries = wagtail_jotform_settings.PUBLISH_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            with using_account(account):
+                push_page_properties(page)
+        except FormPushRejected:
+            # Server errors are already retried by the client, and the API
+            # won't accept the push on another attempt
+            logger.exception(f"Jotform rejected the properties of page {page_id}")
+            return
+        except CantPullFromAPI:
+            if attempt == retries:
+                logger.exception(f"Failed to push properties for page {page_id}")
+                return
+            time.sleep(wagtail_jotform_settings.PUBLISH_BACKOFF_FACTOR * 2**attempt)
+        else:
+            return
+
+
+class SyncBackend:
+    """
+    Push properties on the publishing request, raising `CantPullFromAPI` if
+    the API can't be reached. HTTP error responses don't fail the publish,
+    and are recorded on the page's `FormPropertiesPush`.
+    """
+
+    def enqueue(self, page):
+        try:
+            push_page_properties(page)
+        except FormPushRejected:
+            logger.exception(f"Jotform rejected the properties of page {page.pk}")
+
+
+class BaseDeferredBackend:
+    """
+    Record the push as pending and dispatch it once the publish has been
+    committed. Pushes of a page that is already queued are dropped, as the
+    queued push reads the page when it runs.
+    """
+
+    def enqueue(self, page):
+        FormPropertiesPush.objects.update_or_create(
+            page=page,
+            defaults={
+                "status": FormPropertiesPush.Status.PENDING,
+                "attempts": 0,
+                "error": "",
+            },
+        )
+        transaction.on_commit(lambda: self.queue(page))
+
+    def queue(self, page):
+        # Only mark the page as queued once the publish has committed, so a
+        # rolled back publish doesn't suppress the next one
+        if not cache.add(_dedupe_key(page.pk), True, timeout=DEDUPE_TIMEOUT):
+            publish_outcome.send(
+                sender=EmbeddedFormPage, page=page, outcome="duplicate"
+            )
+            return
+        self.dispatch(page.pk)
+        publish_outcome.send(sender=EmbeddedFormPage, page=page, outcome="queued")
+
+    def dispatch(self, page_id):
+        raise NotImplementedError
+
+
+def _run_in_thread(page_id):
+    try:
+        run_properties_push(page_id)
+    finally:
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=wagtail_jotform_settings.PUBLISH_WORKERS,
+                thread_name_prefix="wagtail_jotform_publish",
+            )
+        return _executor
+
+
+class ThreadPoolBackend(BaseDeferredBackend):
+    """
+    Push properties from a bounded pool of threads in the web process.
+    """
+
+    def dispatch(self, page_id):
+        _get_executor().submit(_run_in_thread, page_id)
+
+
+class TaskBackend(BaseDeferredBackend):
+    """
+    Push properties from a Django task, using `django.tasks` or the
+    `django-tasks` package.
+    """
+
+    def dispatch(self, page_id):
+        from .tasks import push_properties
+
+        push_properties.enqueue(page_id)
+
+
+def get_publish_backend():
+    return import_string(wagtail_jotform_settings.PUBLISH_BACKEND)()
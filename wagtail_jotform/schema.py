@@ -0,0 +1,192 @@
+import logging
+import time
+
+from .accounts import DEFAULT_ACCOUNT, account_key, get_current_account
+from .cache import get_cached, refresh_in_background, set_cached, single_flight
+from .models import JotForm
+from .profiling import in_current_context
+from .settings import wagtail_jotform_settings
+from .signals import cache_accessed
+from .utils import BACKGROUND, INTERACTIVE, CantPullFromAPI, _get_api_config, fetch_data
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_KEY = "wagtail_jotform:schema"
+
+# Jotform question types that can be rendered natively, and the input each
+# one is rendered as
+INPUT_TYPES = {
+    "control_textbox": "text",
+    "control_email": "email",
+    "control_number": "number",
+    "control_textarea": "textarea",
+    "control_dropdown": "select",
+    "control_radio": "radio",
+    "control_checkbox": "checkbox",
+    "control_fullname": "fullname",
+}
+CONTENT_TYPES = {"control_head", "control_text", "control_button", "control_divider"}
+
+
+def _get_form_updated_at(form_id, priority):
+    """
+    Return when `form_id` was last updated, from the `JotForm` table if it's
+    synced, or otherwise from the API.
+    """
+    # The `JotForm` table only holds the forms of the default account
+    if (
+        wagtail_jotform_settings.SYNC_FORMS
+        and get_current_account() == DEFAULT_ACCOUNT
+        and (
+            updated_at := JotForm.objects.filter(form_id=form_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    ):
+        return updated_at.isoformat()
+
+    api_url, api_key = _get_api_credentials()
+    form = fetch_data(
+        f"{api_url}/form/{form_id}", {"APIKEY": api_key}, priority=priority
+    )
+    content = form.get("content") or {}
+    # Forms that have never been edited have no `updated_at`
+    return content.get("updated_at") or content.get("created_at") or ""
+
+
+def _parse_question(form_id, question):
+    question_type = question.get("type")
+    if question_type not in INPUT_TYPES:
+        return {"type": question_type, "text": question.get("text", "")}
+
+    qid = question["qid"]
+    field = {
+        "type": question_type,
+        "input_type": INPUT_TYPES[question_type],
+        "id": f"input_{form_id}_{qid}",
+        "name": f"q{qid}_{question.get('name', '')}",
+        "label": question.get("text", ""),
+        "hint": question.get("hint", ""),
+        "required": question.get("required") == "Yes",
+        "options": [
+            option for option in question.get("options", "").split("|") if option
+        ],
+        "empty_text": question.get("emptyText", ""),
+    }
+    if question_type == "control_fullname":
+        sublabels = question.get("sublabels") or {}
+        field["subfields"] = [
+            (f"{field['name']}[{part}]", f"{field['id']}_{part}", sublabels.get(part))
+            for part in ("first", "last")
+        ]
+    return field
+
+
+def parse_form_schema(form_id, questions, properties):
+    """
+    Return the questions of `form_id`, in order, ready to render with
+    `tags/native_form.html`. Returns `None` if the form uses a question type
+    that can't be rendered natively.
+    """
+    visible = sorted(
+        (q for q in questions.values() if q.get("hidden") != "Yes"),
+        key=lambda q: int(q.get("order") or 0),
+    )
+    fields = []
+    submit_label = "Submit"
+    for question in visible:
+        question_type = question.get("type")
+        if question_type == "control_button":
+            submit_label = question.get("text") or submit_label
+        elif question_type in INPUT_TYPES or question_type in CONTENT_TYPES:
+            fields.append(_parse_question(form_id, question))
+        else:
+            logger.info(f"Form {form_id} can't be rendered natively: {question_type}")
+            return None
+    return {
+        "title": properties.get("title", ""),
+        "fields": fields,
+        "submit_label": submit_label,
+    }
+
+
+def _get_api_credentials():
+    if (config := _get_api_config()) is None:
+        raise CantPullFromAPI("The Jotform API isn't configured")
+    api_url, api_key, _ = config
+    return api_url, api_key
+
+
+def _fetch_form_schema(form_id, priority):
+    api_url, api_key = _get_api_credentials()
+    headers = {"APIKEY": api_key}
+    questions = fetch_data(
+        f"{api_url}/form/{form_id}/questions", headers, priority=priority
+    )
+    properties = fetch_data(
+        f"{api_url}/form/{form_id}/properties", headers, priority=priority
+    )
+    return parse_form_schema(
+        form_id, questions.get("content") or {}, properties.get("content") or {}
+    )
+
+
+def _set_schema_entry(key, updated_at, schema):
+    entry = {"updated_at": updated_at, "checked_at": time.time(), "schema": schema}
+    set_cached(key, entry, timeout=wagtail_jotform_settings.FORM_SCHEMA_TIMEOUT)
+    return entry
+
+
+def _refresh_form_schema(form_id, key):
+    entry = get_cached(key)
+    try:
+        updated_at = _get_form_updated_at(form_id, BACKGROUND)
+        if entry is not None and entry["updated_at"] == updated_at:
+            _set_schema_entry(key, updated_at, entry["schema"])
+        else:
+            _set_schema_entry(key, updated_at, _fetch_form_schema(form_id, BACKGROUND))
+    except CantPullFromAPI:
+        # Keep serving the cached schema, and check again after the interval
+        if entry is not None:
+            _set_schema_entry(key, entry["updated_at"], entry["schema"])
+        raise
+
+
+def get_form_schema(form_id):
+    """
+    Return the questions and properties of `form_id` for the current account,
+    parsed by `parse_form_schema`. Returns `None` if the form can't be
+    rendered natively, or can't be fetched and isn't cached.
+
+    The schema is fetched on the request only when nothing is cached. Once a
+    cached schema is `FORM_SCHEMA_CHECK_INTERVAL` seconds old, it's still
+    served while a background refresh checks the form's `updated_at`, and
+    fetches the form again if it has changed. Failures are cached for the
+    same interval.
+    """
+    key = account_key(f"{SCHEMA_CACHE_KEY}:{form_id}")
+    if (entry := get_cached(key)) is not None:
+        interval = wagtail_jotform_settings.FORM_SCHEMA_CHECK_INTERVAL
+        if entry["checked_at"] + interval <= time.time():
+            cache_accessed.send(sender=None, key=SCHEMA_CACHE_KEY, result="stale")
+            refresh_in_background(
+                key, in_current_context(lambda: _refresh_form_schema(form_id, key))
+            )
+        else:
+            cache_accessed.send(sender=None, key=SCHEMA_CACHE_KEY, result="hit")
+        return entry["schema"]
+
+    cache_accessed.send(sender=None, key=SCHEMA_CACHE_KEY, result="miss")
+
+    def fetch():
+        try:
+            updated_at = _get_form_updated_at(form_id, INTERACTIVE)
+            schema = _fetch_form_schema(form_id, INTERACTIVE)
+        except CantPullFromAPI:
+            # Cache the failure, so visitors aren't each kept waiting on the
+            # API, and retry in the background after the check interval
+            logger.warning(f"Couldn't fetch the schema of form {form_id}")
+            return _set_schema_entry(key, None, None)
+        return _set_schema_entry(key, updated_at, schema)
+
+    return single_flight(key, lambda: get_cached(key), fetch)["schema"]
@@ -1,12 +1,86 @@
+import contextvars
+
 from django.conf import settings
 
-DEFAULTS = {"LIMIT": 50}  # Default limit for JotForm API requests
+DEFAULT_ACCOUNT = "default"
+
+# Settings that can be set for each account in `ACCOUNTS`
+ACCOUNT_SETTINGS = ("API_URL", "API_KEY", "LIMIT", "FORM_URL", "SUBMIT_URL")
+
+# The name of the Jotform account used by API calls, see `accounts.using_account`
+current_account = contextvars.ContextVar("wagtail_jotform_account", default=None)
+
+DEFAULTS = {
+    "ACCOUNTS": {},  # Settings of each Jotform account, by account name
+    "SITE_ACCOUNTS": {},  # Account names by site hostname or id
+    "LIMIT": 50,  # Default limit for JotForm API requests
+    "PAGE_WORKERS": 4,  # Maximum number of form list pages fetched in parallel
+    "POOL_SIZE": 10,  # Maximum number of kept-alive connections to the API
+    "RETRIES": 3,  # Retries for connection errors and 429/5xx responses
+    "BACKOFF_FACTOR": 0.5,  # Exponential backoff between retries, in seconds
+    "TIMEOUT": 10,  # Default timeout for API requests, in seconds
+    "ENDPOINT_TIMEOUTS": {},  # Timeouts for API paths containing the given key
+    "STREAM_RESPONSES": False,  # Parse the form list as it's streamed
+    "STREAM_CHUNK_SIZE": 8192,  # Bytes read at a time from streamed responses
+    "RESPONSE_CACHE_TIMEOUT": 86400,  # How long API responses are kept, 0 disables
+    "RESPONSE_CACHE_ENDPOINTS": (
+        "/user/forms",
+    ),  # API paths whose responses are cached
+    "CIRCUIT_FAILURE_THRESHOLD": 5,  # Consecutive failures that open the circuit
+    "CIRCUIT_RESET_TIMEOUT": 30,  # Seconds the circuit stays open before a probe
+    "RATE_LIMIT_RESERVE": 100,  # API calls left at which background work stops
+    "RATE_LIMIT_SLOW_THRESHOLD": 1000,  # API calls left at which it's slowed
+    "RATE_LIMIT_MAX_DELAY": 5,  # Longest delay added to background calls
+    "REFRESH_LOCK_TIMEOUT": 30,  # Expiry of the cross-process cache refresh lock
+    "REFRESH_WAIT_TIMEOUT": 15,  # How long to wait for another process's refresh
+    "CHOICES_SOFT_TTL": 300,  # Age after which cached choices are refreshed
+    "CHOICES_HARD_TTL": 3600,  # Age after which cached choices are discarded
+    "CHOICES_NEGATIVE_TTL": 30,  # How long a failure to fetch choices is cached
+    "CHOICES_REFRESH_CONCURRENCY": 1,  # Threads for background cache refreshes
+    "CHOICES_REFRESH_INTERVAL": 0,  # Seconds between refresher thread checks, 0 disables
+    "CHOICES_COMPRESS_THRESHOLD": 16384,  # Bytes above which cached choices are compressed
+    "LOCAL_CACHE_TTL": 60,  # How long each process keeps its own copy of choices
+    "LOCAL_CACHE_SIZE": 16,  # Maximum number of values each process keeps
+    "CHOOSER_PAGE_SIZE": 20,  # Results per page in the form chooser
+    "EMBED_MODE": "script",  # How forms are embedded, see `models.EmbedMode`
+    "EMBED_HEIGHT": 500,  # Height reserved for forms not in the `JotForm` table
+    "FORM_URL": "https://form.jotform.com",  # Where embedded forms are loaded from
+    "SUBMIT_URL": "https://submit.jotform.com",  # Where native forms are submitted to
+    "FORM_SCHEMA_TIMEOUT": 86400,  # How long the schemas of native forms are cached
+    "FORM_SCHEMA_CHECK_INTERVAL": 300,  # Seconds between checks for updated forms
+    "PAGE_CACHE_TIMEOUT": 0,  # How long form pages are cached, 0 disables
+    "PURGE_FRONTEND_CACHE": False,  # Purge form pages from the frontend cache
+    "PROFILE_REQUESTS": False,  # Add Jotform calls to `Server-Timing` headers
+    "SYNC_FORMS": False,  # Read form choices from the local `JotForm` table
+    "SYNC_BATCH_SIZE": 500,  # Rows written per query when syncing
+    "SUBMISSIONS_LIMIT": 1000,  # Submissions requested per page when syncing
+    "SUBMISSION_SYNC_WORKERS": 4,  # Forms whose submissions are synced at once
+    "WEBHOOK_SECRET": "",  # Token Jotform must send to the submission webhook
+    "WEBHOOK_BATCH_SIZE": 100,  # Webhook submissions buffered before a write
+    "WEBHOOK_FLUSH_INTERVAL": 1,  # Longest a webhook submission is buffered, in seconds
+    "WEBHOOK_BUFFER_LIMIT": 10000,  # Most webhook submissions buffered per process
+    "REGISTER_WEBHOOK": False,  # Register the webhook when a page is published
+    # How thank you URLs are pushed to Jotform when a page is published
+    "PUBLISH_BACKEND": "wagtail_jotform.publishing.SyncBackend",
+    "PUBLISH_WORKERS": 2,  # Threads used by the `ThreadPoolBackend`
+    "PUBLISH_RETRIES": 3,  # Retries of a failed push by the background backends
+    "PUBLISH_BACKOFF_FACTOR": 2,  # Exponential backoff between retries, in seconds
+}
 
 
 class WagtailJotFormSettings:
     def __getattr__(self, attr):
         django_settings = getattr(settings, "WAGTAIL_JOTFORM", {})
 
+        account = current_account.get()
+        if attr in ACCOUNT_SETTINGS and account not in (None, DEFAULT_ACCOUNT):
+            account_settings = django_settings.get("ACCOUNTS", {}).get(account, {})
+            if attr in account_settings:
+                return account_settings[attr]
+            # Never fall back to the API key of the default account
+            if attr == "API_KEY":
+                return None
+
         try:
             # Check if present in user settings
             return django_settings[attr]
@@ -0,0 +1,16 @@
+from django.dispatch import Signal
+
+# Sent after each request to the Jotform API, with the `account`, `method`,
+# `url`, normalised `endpoint`, `status` (or exception name), `duration` in
+# seconds, response `size` in bytes and `limit_left` of the request, where
+# known.
+api_call_finished = Signal()
+
+# Sent when the form choices are read from the cache, with the cache `key` and
+# a `result` of "hit", "stale" or "miss".
+cache_accessed = Signal()
+
+# Sent when the publish hook or a properties push is done with a page, with
+# the `page`, an `outcome` of "succeeded", "failed", "queued", "duplicate" or
+# "unchanged", and the `duration` of the push in seconds, if one was made.
+publish_outcome = Signal()
@@ -0,0 +1,57 @@
+(function () {
+  function load(container) {
+    if (container.dataset.jotformLoaded) {
+      return;
+    }
+    container.dataset.jotformLoaded = "true";
+    var iframe = document.createElement("iframe");
+    iframe.src = container.dataset.src;
+    iframe.title = container.dataset.title;
+    iframe.height = container.dataset.height;
+    iframe.style.cssText =
+      "width: 100%; height: " + container.dataset.height + "px; border: 0";
+    container.replaceChildren(iframe);
+  }
+
+  function init() {
+    var observer = null;
+    if ("IntersectionObserver" in window) {
+      observer = new IntersectionObserver(
+        function (entries) {
+          entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+              observer.unobserve(entry.target);
+              load(entry.target);
+            }
+          });
+        },
+        // Start loading just before the form scrolls into view
+        { rootMargin: "200px" }
+      );
+    }
+
+    // This script is included once per embed, so skip embeds already set up
+    document
+      .querySelectorAll("[data-jotform-embed]:not([data-jotform-ready])")
+      .forEach(function (container) {
+        container.dataset.jotformReady = "true";
+        if (container.dataset.jotformEmbed === "facade") {
+          container
+            .querySelector("[data-jotform-load]")
+            .addEventListener("click", function () {
+              load(container);
+            });
+        } else if (observer) {
+          observer.observe(container);
+        } else {
+          load(container);
+        }
+      });
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+  } else {
+    init();
+  }
+})();
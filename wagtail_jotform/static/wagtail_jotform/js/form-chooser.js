@@ -0,0 +1,100 @@
+(function () {
+  function initChooser(chooser) {
+    var input = chooser.querySelector('input[type="hidden"]');
+    var search = chooser.querySelector(".jotform-chooser__search");
+    var results = chooser.querySelector(".jotform-chooser__results");
+    var more = chooser.querySelector(".jotform-chooser__more");
+    var searchUrl = chooser.dataset.searchUrl;
+    var query = "";
+    var page = 1;
+    var timer = null;
+    var request = 0;
+
+    function choose(form) {
+      input.value = form.id;
+      search.value = form.title;
+      results.hidden = true;
+      more.hidden = true;
+      input.dispatchEvent(new Event("change", { bubbles: true }));
+    }
+
+    function render(data, append) {
+      if (!append) {
+        results.innerHTML = "";
+      }
+      data.results.forEach(function (form) {
+        var item = document.createElement("li");
+        var button = document.createElement("button");
+        button.type = "button";
+        button.className = "button button-small button-secondary";
+        button.textContent = form.title + " (" + form.id + ")";
+        button.addEventListener("click", function () {
+          choose(form);
+        });
+        item.appendChild(button);
+        results.appendChild(item);
+      });
+      results.hidden = !results.children.length;
+      more.hidden = !data.has_next;
+    }
+
+    function load(append) {
+      var current = ++request;
+      var url =
+        searchUrl +
+        (searchUrl.indexOf("?") === -1 ? "?" : "&") +
+        "q=" +
+        encodeURIComponent(query) +
+        "&p=" +
+        encodeURIComponent(page);
+      fetch(url, { credentials: "same-origin" })
+        .then(function (response) {
+          return response.json();
+        })
+        .then(function (data) {
+          // Ignore responses to searches that have since been replaced
+          if (current === request) {
+            render(data, append);
+          }
+        });
+    }
+
+    search.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        query = search.value.trim();
+        page = 1;
+        load(false);
+      }, 250);
+    });
+
+    search.addEventListener("focus", function () {
+      // Show the first page of forms when the search is opened
+      if (!results.children.length) {
+        query = "";
+        page = 1;
+        load(false);
+      }
+    });
+
+    more.addEventListener("click", function () {
+      page += 1;
+      load(true);
+    });
+  }
+
+  function initAll() {
+    document
+      .querySelectorAll("[data-jotform-chooser]:not([data-initialised])")
+      .forEach(function (chooser) {
+        chooser.dataset.initialised = "true";
+        initChooser(chooser);
+      });
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initAll);
+  } else {
+    initAll();
+  }
+})();
@@ -0,0 +1,24 @@
+(function () {
+  function init() {
+    // This script is included once per form, so skip forms already set up
+    document
+      .querySelectorAll("[data-jotform-native]:not([data-jotform-ready])")
+      .forEach(function (form) {
+        form.dataset.jotformReady = "true";
+        form.addEventListener("submit", function () {
+          // Jotform's spam check expects the form id twice once scripts ran
+          var formId = form.dataset.jotformNative;
+          form.querySelector("[name=simple_spc]").value = formId + "-" + formId;
+          form.querySelectorAll("[type=submit]").forEach(function (button) {
+            button.disabled = true;
+          });
+        });
+      });
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+  } else {
+    init();
+  }
+})();
@@ -0,0 +1,304 @@
+import json
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone as django_timezone
+
+from .accounts import DEFAULT_ACCOUNT, get_account_for_page, using_account
+from .models import (
+    EmbeddedFormPage,
+    JotForm,
+    JotFormSubmission,
+    JotFormSubmissionSyncState,
+)
+from .settings import wagtail_jotform_settings
+from .utils import BACKGROUND, _get_api_config, fetch_data, iter_jotform_pages
+
+logger = logging.getLogger(__name__)
+
+JOTFORM_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FORM_FIELDS = [
+    "title",
+    "status",
+    "url",
+    "height",
+    "count",
+    "created_at",
+    "updated_at",
+    "synced_at",
+]
+
+
+def parse_jotform_datetime(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, JOTFORM_DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+    return parsed.replace(tzinfo=timezone.utc)
+
+
+def format_jotform_datetime(value):
+    return value.astimezone(timezone.utc).strftime(JOTFORM_DATETIME_FORMAT)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _form_from_item(item, synced_at):
+    created_at = parse_jotform_datetime(item.get("created_at"))
+    return JotForm(
+        form_id=item["id"],
+        title=item.get("title", ""),
+        status=item.get("status", ""),
+        url=item.get("url", ""),
+        height=_to_int(item.get("height")),
+        count=_to_int(item.get("count")) or 0,
+        created_at=created_at,
+        # Forms that have never been edited have no `updated_at`
+        updated_at=parse_jotform_datetime(item.get("updated_at")) or created_at,
+        synced_at=synced_at,
+    )
+
+
+def sync_forms(full=False):
+    """
+    Mirror the forms in the Jotform account into the `JotForm` table.
+
+    After the first import, only forms updated since the newest `updated_at`
+    already stored are requested, unless `full` is set. A full sync also
+    removes forms that are no longer in the account.
+
+    Returns a `(created, updated, deleted)` tuple of counts.
+    """
+    params = {}
+    watermark = JotForm.objects.aggregate(watermark=Max("updated_at"))["watermark"]
+    if watermark is None:
+        full = True
+    if not full:
+        params = {
+            "filter": json.dumps({"updated_at:gt": format_jotform_datetime(watermark)}),
+            "orderby": "updated_at",
+        }
+
+    batch_size = wagtail_jotform_settings.SYNC_BATCH_SIZE
+    synced_at = django_timezone.now()
+    created = updated = deleted = 0
+    fetched = False
+
+    with transaction.atomic():
+        for page in iter_jotform_pages(priority=BACKGROUND, **params):
+            fetched = True
+            forms = [
+                _form_from_item(item, synced_at) for item in page.get("content", [])
+            ]
+            existing = dict(
+                JotForm.objects.filter(
+                    form_id__in=[form.form_id for form in forms]
+                ).values_list("form_id", "pk")
+            )
+            to_create = []
+            to_update = []
+            for form in forms:
+                if form.form_id in existing:
+                    form.pk = existing[form.form_id]
+                    to_update.append(form)
+                else:
+                    to_create.append(form)
+
+            JotForm.objects.bulk_create(to_create, batch_size=batch_size)
+            JotForm.objects.bulk_update(to_update, FORM_FIELDS, batch_size=batch_size)
+            created += len(to_create)
+            updated += len(to_update)
+
+        # Don't empty the table if the API isn't configured
+        if full and fetched:
+            deleted, _ = JotForm.objects.filter(synced_at__lt=synced_at).delete()
+
+    logger.info(f"Synced Jotform forms: {created} created, {updated} updated")
+    return created, updated, deleted
+
+
+_DONE = object()
+
+SUBMISSION_FIELDS = ["form_id", "status", "ip", "answers", "created_at", "updated_at"]
+
+
+def _submission_from_item(item):
+    return JotFormSubmission(
+        submission_id=item["id"],
+        form_id=item.get("form_id", ""),
+        status=item.get("status", ""),
+        ip=item.get("ip", ""),
+        answers=item.get("answers") or {},
+        created_at=parse_jotform_datetime(item.get("created_at")),
+        updated_at=parse_jotform_datetime(item.get("updated_at")),
+    )
+
+
+def _put(results, stop, item):
+    # Give up if the consumer has stopped, rather than block on a full queue
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def iter_submission_pages(form_id, since=None, account=None, priority=BACKGROUND):
+    """
+    Yield each page of the submissions to `form_id` created since `since`,
+    oldest first, from the Jotform `account`. Requests are made at `priority`
+    for the rate limit scheduler.
+    """
+    # The account is set around each request rather than the whole generator,
+    # which may be resumed from another thread
+    with using_account(account):
+        config = _get_api_config()
+    if config is None:
+        return
+    api_url, api_key, _ = config
+    limit = wagtail_jotform_settings.SUBMISSIONS_LIMIT
+    params = {"orderby": "created_at", "limit": limit}
+    if since is not None:
+        # Timestamps are to the second, so submissions made in the same second
+        # as `since` are fetched again, and skipped or replaced when stored
+        params["filter"] = json.dumps(
+            {"created_at:gte": format_jotform_datetime(since)}
+        )
+
+    offset = 0
+    while True:
+        with using_account(account):
+            page = fetch_data(
+                f"{api_url}/form/{form_id}/submissions",
+                {"APIKEY": api_key},
+                priority=priority,
+                offset=offset,
+                **params,
+            )
+        content = page.get("content") or []
+        yield content
+        if len(content) < limit:
+            return
+        offset += limit
+
+
+def _get_form_accounts(form_ids=None):
+    """
+    Return the account of each form used by an `EmbeddedFormPage`, limited to
+    `form_ids` if given, from the account of the page's site. Forms that
+    aren't used by a page belong to the default account.
+    """
+    pages = EmbeddedFormPage.objects.exclude(form="")
+    if form_ids is not None:
+        pages = pages.filter(form__in=form_ids)
+    accounts = {page.form: get_account_for_page(page) for page in pages}
+    for form_id in form_ids or []:
+        accounts.setdefault(form_id, DEFAULT_ACCOUNT)
+    return accounts
+
+
+def _fetch_submissions(form_id, since, account, results, stop):
+    try:
+        for content in iter_submission_pages(form_id, since, account=account):
+            if content and not _put(results, stop, (form_id, content)):
+                return
+    except Exception as e:
+        _put(results, stop, (form_id, e))
+    else:
+        _put(results, stop, (form_id, _DONE))
+
+
+def sync_submissions(form_ids=None):
+    """
+    Copy new submissions to each of `form_ids` into the `JotFormSubmission`
+    table, defaulting to the forms used by `EmbeddedFormPage`s. Each form is
+    fetched with the account of the site its pages are on.
+
+    Each form resumes from the newest submission copied by its last successful
+    sync. Forms are fetched in parallel, and their pages are written from this
+    thread with `bulk_create`, replacing submissions that are already stored.
+
+    Returns a dict of the number of submissions fetched per form, and a dict of
+    the errors for forms that failed.
+    """
+    if form_ids is not None:
+        form_ids = list(dict.fromkeys(form_ids))
+    accounts = _get_form_accounts(form_ids)
+    form_ids = list(accounts) if form_ids is None else form_ids
+    watermarks = dict(
+        JotFormSubmissionSyncState.objects.filter(form_id__in=form_ids).values_list(
+            "form_id", "last_created_at"
+        )
+    )
+    counts = dict.fromkeys(form_ids, 0)
+    errors = {}
+    if not form_ids:
+        return counts, errors
+
+    workers = min(wagtail_jotform_settings.SUBMISSION_SYNC_WORKERS, len(form_ids))
+    results = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="wagtail_jotform_submissions"
+    )
+    try:
+        for form_id in form_ids:
+            executor.submit(
+                _fetch_submissions,
+                form_id,
+                watermarks.get(form_id),
+                accounts[form_id],
+                results,
+                stop,
+            )
+
+        pending = len(form_ids)
+        while pending:
+            form_id, result = results.get()
+            if result is _DONE:
+                pending -= 1
+                JotFormSubmissionSyncState.objects.update_or_create(
+                    form_id=form_id,
+                    defaults={"last_created_at": watermarks.get(form_id)},
+                )
+            elif isinstance(result, Exception):
+                pending -= 1
+                errors[form_id] = result
+                logger.error(f"Failed to sync submissions to form {form_id}: {result}")
+            else:
+                submissions = [_submission_from_item(item) for item in result]
+                # Replaces submissions stored by the webhook with the API's copy
+                JotFormSubmission.objects.bulk_create(
+                    submissions,
+                    batch_size=wagtail_jotform_settings.SYNC_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=["submission_id"],
+                    update_fields=SUBMISSION_FIELDS,
+                )
+                counts[form_id] += len(submissions)
+                # Only saved once every page of the form has been written
+                created = [s.created_at for s in submissions if s.created_at]
+                if watermarks.get(form_id):
+                    created.append(watermarks[form_id])
+                if created:
+                    watermarks[form_id] = max(created)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return counts, errors
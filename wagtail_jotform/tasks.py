@@ -0,0 +1,11 @@
+try:
+    from django.tasks import task
+except ImportError:
+    from django_tasks import task
+
+from .publishing import run_properties_push
+
+
+@task()
+def push_properties(page_id):
+    run_properties_push(page_id)
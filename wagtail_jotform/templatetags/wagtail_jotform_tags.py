@@ -0,0 +1,51 @@
+from django import template
+
+from ..accounts import using_account
+from ..models import EmbedMode, JotForm
+from ..schema import get_form_schema
+from ..settings import wagtail_jotform_settings
+
+register = template.Library()
+
+
+@register.inclusion_tag("wagtail_jotform/tags/embed.html")
+def jotform_embed(form_id, mode=None, height=None, title=None, account=None):
+    """
+    Embed the Jotform form `form_id`, using one of the `models.EmbedMode`
+    values and defaulting to the `EMBED_MODE` setting. Forms are loaded from
+    the `FORM_URL` of `account`.
+
+    Unless `height` is given, the iframe modes reserve space for the form
+    using the height stored in the `JotForm` table, so the page doesn't move
+    when it loads.
+
+    The `native` mode renders the form's cached questions as HTML, falling
+    back to a lazy iframe if they can't be fetched or rendered.
+    """
+    mode = mode or wagtail_jotform_settings.EMBED_MODE
+    schema = None
+    with using_account(account):
+        form_url = wagtail_jotform_settings.FORM_URL
+        submit_url = wagtail_jotform_settings.SUBMIT_URL
+        if mode == EmbedMode.NATIVE:
+            schema = get_form_schema(form_id)
+            if schema is None:
+                mode = EmbedMode.IFRAME
+    # Only the iframe modes use the height and title
+    if mode not in (EmbedMode.SCRIPT, EmbedMode.NATIVE) and (
+        height is None or title is None
+    ):
+        form = JotForm.objects.filter(form_id=form_id).only("height", "title").first()
+        if form is not None:
+            height = height or form.height
+            title = title or form.title
+    return {
+        "form_id": form_id,
+        "mode": mode,
+        "schema": schema,
+        "action": f"{submit_url}/submit/{form_id}/",
+        "src": f"{form_url}/{form_id}",
+        "script_src": f"{form_url}/jsform/{form_id}",
+        "height": height or wagtail_jotform_settings.EMBED_HEIGHT,
+        "title": title or "Form",
+    }
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.sitemaps",
+    "debug_toolbar",
     # Add your app here
     "wagtail_jotform.tests.testapp",
     "wagtail_jotform",
@@ -83,3 +84,13 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
     }
 }
+
+# Keep expected API failures out of the test output
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "loggers": {"wagtail_jotform": {"level": "CRITICAL"}},
+}
+
+# The debug toolbar is only installed to test `JotFormPanel`
+SILENCED_SYSTEM_CHECKS = ["debug_toolbar.W001"]
@@ -1,16 +1,81 @@
+import csv
+import json
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 from unittest import mock
 
 from django.conf import settings
-from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
 from wagtail.models import Page, Site
 
-from requests.exceptions import Timeout
-
-from ..models import EmbeddedFormPage, jot_form_choices
+import requests
+from debug_toolbar.toolbar import DebugToolbar
+from requests.exceptions import ConnectionError, Timeout
+
+from ..accounts import get_account_names, using_account
+from ..cache import _refresh, get_cached, local_cache, refresh_in_background, set_cached
+from ..choices import FormChoices
+from ..client import CircuitOpen, get_client, reset_client
+from ..export import _row
+from ..metrics import metrics
+from ..models import (
+    CHOICES_CACHE_KEY,
+    EmbeddedFormPage,
+    FormPropertiesPush,
+    JotForm,
+    JotFormSubmission,
+    JotFormSubmissionSyncState,
+    _fetch_form_choices,
+    form_choice_exists,
+    jot_form_choices,
+)
+from ..page_cache import get_page_version
+from ..panels import JotFormPanel
+from ..profiling import get_recorder, record_calls
+from ..publishing import run_properties_push
 from ..settings import wagtail_jotform_settings
-from ..utils import CantPullFromAPI, JotFormAPI
+from ..sync import sync_forms, sync_submissions
+from ..utils import (
+    BACKGROUND,
+    INTERACTIVE,
+    CantPullFromAPI,
+    JotFormAPI,
+    RateLimitDeferred,
+    fetch_data,
+    get_rate_limit_budget,
+    iter_json_content,
+    rate_limit_scheduler,
+    stream_content,
+)
 from ..wagtail_hooks import do_after_publish_page
+from ..warmup import warm_form_choices
+from ..webhooks import parse_webhook, submission_buffer
+
+
+def json_response(data, status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = json.dumps(data).encode() if data is not None else b""
+    return response
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 
 class TestThankYouHook(TestCase):
@@ -36,6 +101,273 @@ class TestThankYouHook(TestCase):
         self.assertEqual(r, None)
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestLocalCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_reads_only_version_while_current(self):
+        set_cached("key", ["value"], timeout=60)
+        local_cache.clear()
+
+        self.assertEqual(get_cached("key"), ["value"])
+        with mock.patch(
+            "wagtail_jotform.cache.cache.get", wraps=cache.get
+        ) as mock_cache_get:
+            self.assertEqual(get_cached("key"), ["value"])
+
+        mock_cache_get.assert_called_once_with("key:version")
+
+    def test_refresh_by_another_process_invalidates(self):
+        set_cached("key", ["old"], timeout=60)
+
+        # Another process refreshes the value and bumps the version
+        cache.set("key", ["new"])
+        cache.set("key:version", "another-version")
+
+        self.assertEqual(get_cached("key"), ["new"])
+
+    @override_settings(CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM={"LOCAL_CACHE_SIZE": 2})
+    def test_least_recently_used_values_are_evicted(self):
+        local_cache.set("a", 1, "A")
+        local_cache.set("b", 1, "B")
+        local_cache.get("a", 1)
+        local_cache.set("c", 1, "C")
+
+        self.assertEqual(local_cache.get("a", 1), "A")
+        self.assertIsNone(local_cache.get("b", 1))
+        self.assertEqual(local_cache.get("c", 1), "C")
+
+    @override_settings(CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM={"LOCAL_CACHE_TTL": 0})
+    def test_values_expire(self):
+        local_cache.set("a", 1, "A")
+        self.assertIsNone(local_cache.get("a", 1))
+
+
+class TestFormChoices(TestCase):
+    def setUp(self):
+        self.choices = [("11", "Newsletter signup"), ("12", "Event"), ("21", "Ünïcode")]
+
+    def test_round_trip(self):
+        choices = pickle.loads(pickle.dumps(FormChoices(self.choices)))
+
+        self.assertEqual(len(choices), 3)
+        self.assertEqual(choices, self.choices)
+        self.assertEqual(choices[1], ("12", "Event"))
+        self.assertEqual(choices[1:], self.choices[1:])
+        self.assertEqual(pickle.loads(pickle.dumps(FormChoices())), [])
+
+    def test_lookups_only_decode_what_they_need(self):
+        choices = FormChoices.decode(FormChoices(self.choices).encode())
+
+        self.assertTrue(choices.has_id("12"))
+        self.assertFalse(choices.has_id("1"))
+        self.assertIsNone(choices._titles)
+        self.assertIsNone(choices._ids)
+        self.assertEqual(choices.get_title("21"), "Ünïcode")
+        self.assertEqual(choices.search("sign"), [("11", "Newsletter signup")])
+
+    @override_settings(WAGTAIL_JOTFORM={"CHOICES_COMPRESS_THRESHOLD": 100})
+    def test_large_payloads_are_compressed(self):
+        small = FormChoices(self.choices).encode()
+        large = [(str(i), f"Form {i}") for i in range(100)]
+        payload = FormChoices(large).encode()
+
+        self.assertIn("Newsletter signup".encode(), small)
+        self.assertLess(len(payload), len(pickle.dumps(large)))
+        self.assertEqual(FormChoices.decode(payload), large)
+
+    def test_unknown_format_is_rejected(self):
+        payload = bytearray(FormChoices(self.choices).encode())
+        payload[3] = 99
+
+        with self.assertRaises(ValueError):
+            FormChoices.decode(bytes(payload))
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_incompatible_cached_choices_are_refetched(self, mock_api):
+        cache.clear()
+        local_cache.clear()
+        mock_api.return_value.get_data.return_value = {
+            "content": [{"id": "1", "title": "Form 1"}]
+        }
+        # Choices written in a format this version can't read
+        with mock.patch.object(FormChoices, "encode", return_value=b"JFC\x99"):
+            set_cached(
+                CHOICES_CACHE_KEY,
+                {"choices": FormChoices([("1", "Old form")]), "refresh_at": 0},
+                timeout=60,
+            )
+        local_cache.clear()
+
+        self.assertEqual(jot_form_choices(), [("1", "Form 1")])
+
+        mock_api.return_value.get_data.assert_called_once()
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_choices_cached_by_older_releases_are_refetched(self, mock_api):
+        cache.clear()
+        local_cache.clear()
+        mock_api.return_value.get_data.return_value = {
+            "content": [{"id": "1", "title": "Form 1"}]
+        }
+        # Older releases cached a plain list
+        cache.set("jot_form_choices", [("1", "A")])
+        set_cached(CHOICES_CACHE_KEY, [("1", "A")], timeout=60)
+
+        self.assertEqual(jot_form_choices(), [("1", "Form 1")])
+        self.assertEqual(warm_form_choices(stale_within=60), {"default": 1})
+
+
+class TestPublishing(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        self.homepage = Page.objects.get(url_path="/home/")
+        self.embedded_form_page = self.homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+            )
+        )
+
+    def test_sync_failure_is_recorded(self):
+        with mock.patch(
+            "wagtail_jotform.publishing.push_form_properties",
+            side_effect=CantPullFromAPI("Cant post"),
+        ):
+            with self.assertRaises(CantPullFromAPI):
+                do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.status, FormPropertiesPush.Status.FAILED)
+        self.assertEqual(push.attempts, 1)
+
+    @mock.patch("wagtail_jotform.client.JotFormClient.post")
+    def test_rejected_push_does_not_fail_the_publish(self, mock_post):
+        mock_post.return_value = json_response({}, status_code=404)
+
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.status, FormPropertiesPush.Status.FAILED)
+        self.assertIn("404", push.error)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={
+            "PUBLISH_BACKEND": "wagtail_jotform.publishing.ThreadPoolBackend"
+        },
+    )
+    @mock.patch("wagtail_jotform.publishing.ThreadPoolBackend.dispatch")
+    def test_deferred_publish_is_queued_once(self, mock_dispatch):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            do_after_publish_page(request=None, page=self.embedded_form_page)
+            do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        mock_dispatch.assert_called_once_with(self.embedded_form_page.pk)
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.status, FormPropertiesPush.Status.PENDING)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={
+            "PUBLISH_BACKEND": "wagtail_jotform.publishing.ThreadPoolBackend"
+        },
+    )
+    @mock.patch("wagtail_jotform.publishing.ThreadPoolBackend.dispatch")
+    def test_rolled_back_publish_does_not_suppress_next(self, mock_dispatch):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    do_after_publish_page(request=None, page=self.embedded_form_page)
+                    raise DatabaseError("The publish failed")
+            do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        mock_dispatch.assert_called_once_with(self.embedded_form_page.pk)
+
+    @override_settings(WAGTAIL_JOTFORM={"PUBLISH_RETRIES": 2})
+    @mock.patch("wagtail_jotform.publishing.time.sleep")
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_run_properties_push_retries(self, mock_push, mock_sleep):
+        mock_push.side_effect = [CantPullFromAPI("Cant post"), None]
+
+        run_properties_push(self.embedded_form_page.pk)
+
+        self.assertEqual(mock_push.call_count, 2)
+        mock_sleep.assert_called_once()
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.status, FormPropertiesPush.Status.SUCCEEDED)
+        self.assertEqual(push.attempts, 2)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={"PUBLISH_BACKEND": "wagtail_jotform.publishing.TaskBackend"}
+    )
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_task_backend(self, mock_push):
+        with self.captureOnCommitCallbacks(execute=True):
+            do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        mock_push.assert_called_once()
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.status, FormPropertiesPush.Status.SUCCEEDED)
+
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_unchanged_properties_are_not_pushed_again(self, mock_push):
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+        self.embedded_form_page.introduction = "Only the introduction changed"
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        mock_push.assert_called_once()
+
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_changed_form_resets_old_form(self, mock_push):
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+        self.embedded_form_page.form = "2"
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        self.assertEqual(mock_push.call_count, 3)
+        self.assertEqual(mock_push.call_args_list[1].args[0], "2")
+        mock_push.assert_called_with("1", {"activeRedirect": "default"})
+        push = FormPropertiesPush.objects.get(page=self.embedded_form_page)
+        self.assertEqual(push.form, "2")
+
+    @override_settings(
+        WAGTAIL_JOTFORM={"REGISTER_WEBHOOK": True, "WEBHOOK_SECRET": "s3cret"}
+    )
+    @mock.patch("wagtail_jotform.publishing.register_form_webhook")
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_webhook_registered_with_properties(self, mock_push, mock_register):
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+        do_after_publish_page(request=None, page=self.embedded_form_page)
+
+        mock_register.assert_called_once_with(
+            "1", "http://localhost/jotform/webhook/?token=s3cret"
+        )
+
+    @mock.patch("wagtail_jotform.models.jot_form_choices", return_value=[])
+    def test_push_status_shown_in_editor(self, mock_choices):
+        FormPropertiesPush.objects.create(
+            page=self.embedded_form_page,
+            status=FormPropertiesPush.Status.FAILED,
+            attempts=3,
+            error="Jotform is down",
+        )
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(f"/admin/pages/{self.embedded_form_page.pk}/edit/")
+
+        self.assertContains(response, "Last push to Jotform")
+        self.assertContains(response, "Jotform is down")
+
+
 def mocked_fetch_data(url=None, headers=None, **params):
     return {
         "responseCode": 200,
@@ -146,7 +478,7 @@ class TestUtils(TestCase):
             jotform = JotFormAPI()
             jotform.fetch_from_api()
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_data_logging_timeout(self, mock_logger, mock_requests_get):
         # Setup mock to raise Timeout exception
@@ -164,7 +496,7 @@ class TestUtils(TestCase):
             f"Timeout error occurred when fetching data from {test_url}"
         )
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_data_logging_maxretry(self, mock_logger, mock_requests_get):
         # Setup mock to raise MaxRetryError exception
@@ -184,7 +516,7 @@ class TestUtils(TestCase):
             f"MaxRetryError occured when fetching data from {test_url}"
         )
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_data_logging_http_error(self, mock_logger, mock_requests_get):
         # Setup mock to raise HTTPError exception
@@ -206,7 +538,7 @@ class TestUtils(TestCase):
             f"HTTP/ConnectionError occured when fetching data from {test_url}"
         )
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_data_logging_missing_schema(self, mock_logger, mock_requests_get):
         # Setup mock to raise MissingSchema exception
@@ -229,7 +561,7 @@ class TestUtils(TestCase):
             f"HTTP/ConnectionError occured when fetching data: {error_message}"
         )
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_data_logging_generic_exception(self, mock_logger, mock_requests_get):
         # Setup mock to raise a generic exception
@@ -262,9 +594,9 @@ class TestUtils(TestCase):
         error_msg = "Invalid URL"
 
         # Test 1: Timeout exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_get.side_effect = Timeout()
             with self.assertRaises(CantPullFromAPI):
                 from ..utils import fetch_data
@@ -275,9 +607,9 @@ class TestUtils(TestCase):
             )
 
         # Test 2: HTTPError exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_response = requests.Response()
             mock_response.status_code = 404
             http_error = HTTPError(response=mock_response)
@@ -292,9 +624,9 @@ class TestUtils(TestCase):
             )
 
         # Test 3: ConnectionError exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_get.side_effect = ConnectionError()
             with self.assertRaises(CantPullFromAPI):
                 from ..utils import fetch_data
@@ -305,9 +637,9 @@ class TestUtils(TestCase):
             )
 
         # Test 4: MaxRetryError exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_get.side_effect = MaxRetryError(pool=None, url=None, reason=None)
             with self.assertRaises(CantPullFromAPI):
                 from ..utils import fetch_data
@@ -318,9 +650,9 @@ class TestUtils(TestCase):
             )
 
         # Test 5: MissingSchema exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_get.side_effect = MissingSchema(error_msg)
             with self.assertRaises(CantPullFromAPI):
                 from ..utils import fetch_data
@@ -331,9 +663,9 @@ class TestUtils(TestCase):
             )
 
         # Test 6: Generic Exception
-        with mock.patch("wagtail_jotform.utils.requests.get") as mock_get, mock.patch(
-            "wagtail_jotform.utils.logger"
-        ) as mock_logger:
+        with mock.patch(
+            "wagtail_jotform.client.JotFormClient.get"
+        ) as mock_get, mock.patch("wagtail_jotform.utils.logger") as mock_logger:
             mock_get.side_effect = Exception("Generic error")
             with self.assertRaises(CantPullFromAPI):
                 from ..utils import fetch_data
@@ -343,11 +675,14 @@ class TestUtils(TestCase):
                 f"Exception occured when fetching data from {test_url}"
             )
 
-    @mock.patch("wagtail_jotform.utils.requests.get")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
     def test_fetch_data_successful_response(self, mock_get):
         """Test fetch_data with a successful response."""
         # Create a mock response with a json method
         mock_response = mock.MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.content = b'{"data": "test"}'
         mock_response.json.return_value = {"data": "test"}
         mock_get.return_value = mock_response
 
@@ -359,6 +694,87 @@ class TestUtils(TestCase):
         # Check that the correct data was returned
         self.assertEqual(result, {"data": "test"})
 
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_fetch_data_conditional_get(self, mock_get):
+        """Test unchanged responses reuse the cached parsed body."""
+        cache.clear()
+        test_url = "https://test-api.example.com/user/forms"
+        mock_get.return_value = json_response(
+            {"content": "test"}, headers={"ETag": '"v1"'}
+        )
+        self.assertEqual(fetch_data(test_url, {"APIKEY": "key"}), {"content": "test"})
+
+        mock_get.return_value = json_response(None, status_code=304)
+        self.assertEqual(fetch_data(test_url, {"APIKEY": "key"}), {"content": "test"})
+        self.assertEqual(
+            mock_get.call_args.kwargs["headers"],
+            {"APIKEY": "key", "If-None-Match": '"v1"'},
+        )
+
+        # Requests made with another API key aren't sent the cached validators
+        mock_get.return_value = json_response({"content": "other"})
+        fetch_data(test_url, {"APIKEY": "other-key"})
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"APIKEY": "other-key"})
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_fetch_data_unchanged_content_is_not_cached_again(self, mock_get):
+        """Test the cache isn't rewritten when only the call metadata changed."""
+        cache.clear()
+        test_url = "https://test-api.example.com/user/forms"
+        mock_get.return_value = json_response(
+            {"content": ["form"], "duration": "10ms", "limit-left": 100}
+        )
+        fetch_data(test_url)
+        mock_get.return_value = json_response(
+            {"content": ["form"], "duration": "12ms", "limit-left": 99}
+        )
+
+        with mock.patch("wagtail_jotform.utils.cache.set") as mock_set, mock.patch(
+            "requests.Response.json"
+        ) as mock_json:
+            self.assertEqual(
+                fetch_data(test_url),
+                {"content": ["form"], "duration": "12ms", "limit-left": 99},
+            )
+        # The unchanged body isn't parsed
+        mock_json.assert_not_called()
+        self.assertFalse(
+            [
+                call
+                for call in mock_set.call_args_list
+                if call.args[0].startswith("wagtail_jotform:response:")
+            ]
+        )
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_fetch_data_only_caches_listed_endpoints(self, mock_get):
+        """Test responses such as submissions aren't kept in the cache."""
+        cache.clear()
+        mock_get.return_value = json_response({"content": [{"id": "1"}]})
+
+        with mock.patch("wagtail_jotform.utils.cache") as mock_cache:
+            fetch_data("https://test-api.example.com/form/1/submissions")
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_fetch_data_does_not_cache_filtered_requests(self, mock_get):
+        """Test incremental syncs of the form list aren't kept in the cache."""
+        cache.clear()
+        mock_get.return_value = json_response({"content": [{"id": "1"}]})
+
+        with mock.patch("wagtail_jotform.utils.cache") as mock_cache:
+            fetch_data(
+                "https://test-api.example.com/user/forms",
+                filter='{"updated_at:gt": "2020-10-10 10:00:00"}',
+            )
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+
     @override_settings(WAGTAIL_JOTFORM={})
     @mock.patch("wagtail_jotform.utils.logger")
     def test_fetch_jotform_data_missing_api_url_and_key(self, mock_logger):
@@ -428,53 +844,1363 @@ class TestUtils(TestCase):
         )
         self.assertEqual(result, {"test": "data"})
 
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+        }
+    )
+    @mock.patch("wagtail_jotform.utils.fetch_data")
+    def test_fetch_jotform_data_paginated(self, mock_fetch_data):
+        """Test every page of the form list is fetched and merged in order."""
+        from ..utils import fetch_jotform_data
+
+        def fake_fetch_data(url, headers=None, **params):
+            offset = int(url.partition("offset=")[2] or 0)
+            return {
+                "content": [{"id": str(i)} for i in range(offset, min(offset + 2, 5))],
+                "resultSet": {"offset": offset, "limit": 2, "count": 5},
+            }
+
+        mock_fetch_data.side_effect = fake_fetch_data
 
-class TestSettings(TestCase):
+        result = fetch_jotform_data()
+
+        self.assertEqual(
+            [item["id"] for item in result["content"]], ["0", "1", "2", "3", "4"]
+        )
+        self.assertEqual(mock_fetch_data.call_count, 3)
+        mock_fetch_data.assert_any_call(
+            "https://api.jotform.com/user/forms?limit=2&offset=4",
+            {"APIKEY": "valid-key"},
+        )
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+        }
+    )
+    @mock.patch("wagtail_jotform.utils.fetch_data")
+    def test_fetch_jotform_data_paginated_failure(self, mock_fetch_data):
+        """Test a failing page fails the whole fetch rather than returning a partial list."""
+        from ..utils import fetch_jotform_data
+
+        mock_fetch_data.side_effect = [
+            {"content": [{"id": "0"}], "resultSet": {"limit": 2, "count": 4}},
+            CantPullFromAPI("Error"),
+        ]
+
+        with self.assertRaises(CantPullFromAPI):
+            fetch_jotform_data()
+
+
+class TestClient(TestCase):
     fixtures = ["test.json"]
 
-    def setUp(self):
-        self.default_site = Site.objects.get(is_default_site=True)
-        self.homepage = Page.objects.get(url_path="/home/")
-        self.embedded_form_page = self.homepage.add_child(
+    def tearDown(self):
+        reset_client()
+
+    def test_get_client_is_shared(self):
+        self.assertIs(get_client(), get_client())
+
+    @override_settings(WAGTAIL_JOTFORM={"POOL_SIZE": 3, "RETRIES": 5})
+    def test_session_pool_and_retries(self):
+        adapter = get_client().session.get_adapter("https://api.jotform.com")
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={"TIMEOUT": 7, "ENDPOINT_TIMEOUTS": {"/properties": 3}}
+    )
+    def test_endpoint_timeouts(self):
+        client = get_client()
+        with mock.patch.object(
+            client.session, "request", return_value=json_response({})
+        ) as mock_request:
+            client.post("https://api.jotform.com/form/1/properties")
+            client.get("https://api.jotform.com/user/forms")
+        self.assertEqual(mock_request.call_args_list[0].kwargs["timeout"], 3)
+        self.assertEqual(mock_request.call_args_list[1].kwargs["timeout"], 7)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={"CIRCUIT_FAILURE_THRESHOLD": 2, "CIRCUIT_RESET_TIMEOUT": 30},
+    )
+    def test_circuit_breaker(self):
+        cache.clear()
+        client = get_client()
+        url = "https://api.jotform.com/user/forms"
+
+        with mock.patch.object(client.session, "request") as mock_request:
+            mock_request.side_effect = ConnectionError
+            for _ in range(2):
+                with self.assertRaises(ConnectionError):
+                    client.get(url)
+
+            # The circuit is open, so requests fail without calling the API
+            with self.assertRaises(CircuitOpen):
+                client.get(url)
+            self.assertEqual(mock_request.call_count, 2)
+
+            # Once the reset timeout has passed a single probe is let through
+            mock_request.side_effect = None
+            mock_request.return_value = json_response({})
+            later = time.time() + 31
+            with mock.patch("wagtail_jotform.client.time.time", return_value=later):
+                client.get(url)
+
+            self.assertEqual(mock_request.call_count, 3)
+            self.assertFalse(client.circuit_breaker.is_open())
+            client.get(url)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM={"CIRCUIT_FAILURE_THRESHOLD": 1}
+    )
+    def test_circuit_breaker_counts_server_errors(self):
+        cache.clear()
+        client = get_client()
+
+        with mock.patch.object(client.session, "request") as mock_request:
+            mock_request.return_value = json_response({}, status_code=503)
+            client.post("https://api.jotform.com/form/1/properties")
+
+        self.assertTrue(client.circuit_breaker.is_open())
+
+    @mock.patch("wagtail_jotform.client.JotFormClient.post")
+    def test_publish_hook_uses_client(self, mock_post):
+        homepage = Page.objects.get(url_path="/home/")
+        page = homepage.add_child(
             instance=EmbeddedFormPage(
-                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+                title="Embedded Form Page", slug="embeded-form-page", form="1"
             )
         )
 
-    def test_settings(self):
-        del settings.WAGTAIL_JOTFORM
-        self.assertFalse(wagtail_jotform_settings.API_KEY)
-        self.assertFalse(wagtail_jotform_settings.API_URL)
-        self.assertTrue(wagtail_jotform_settings.LIMIT)
+        do_after_publish_page(request=None, page=page)
+
+        mock_post.assert_called_once()
+        self.assertEqual(
+            mock_post.call_args.args[0], "https://wagtail-jotform.com/form/1/properties"
+        )
+        mock_post.return_value.raise_for_status.assert_called_once()
+
+
+@override_settings(
+    WAGTAIL_JOTFORM={"API_URL": "https://api.jotform.com", "API_KEY": "valid-key"}
+)
+class TestSync(TestCase):
+    @mock.patch("wagtail_jotform.utils.fetch_data", side_effect=mocked_fetch_data)
+    def test_first_sync_imports_all_forms(self, mock_fetch_data):
+        self.assertEqual(sync_forms(), (2, 0, 0))
+
+        mock_fetch_data.assert_called_once_with(
+            "https://api.jotform.com/user/forms?limit=50",
+            {"APIKEY": "valid-key"},
+            priority=BACKGROUND,
+        )
+        form = JotForm.objects.get(form_id="202722038345045")
+        self.assertEqual(form.title, "An email form")
+        self.assertEqual(form.height, 539)
+        self.assertEqual(form.status, JotForm.Status.ENABLED)
+        self.assertEqual(form.updated_at.isoformat(), "2020-10-10T10:34:12+00:00")
+
+    @mock.patch("wagtail_jotform.utils.fetch_data")
+    def test_incremental_sync(self, mock_fetch_data):
+        mock_fetch_data.side_effect = mocked_fetch_data
+        sync_forms()
+
+        updated_form = mocked_fetch_data()["content"][1]
+        updated_form.update(title="Renamed form", updated_at="2020-10-11 09:00:00")
+        mock_fetch_data.side_effect = None
+        mock_fetch_data.return_value = {"content": [updated_form]}
+
+        self.assertEqual(sync_forms(), (0, 1, 0))
+
+        params = mock_fetch_data.call_args.kwargs
+        self.assertEqual(
+            json.loads(params["filter"]), {"updated_at:gt": "2020-10-10 10:34:12"}
+        )
+        self.assertEqual(params["orderby"], "updated_at")
+        self.assertEqual(
+            JotForm.objects.get(form_id="202721468649058").title, "Renamed form"
+        )
+
+    @mock.patch("wagtail_jotform.utils.fetch_data")
+    def test_full_sync_removes_missing_forms(self, mock_fetch_data):
+        mock_fetch_data.side_effect = mocked_fetch_data
+        sync_forms()
+
+        mock_fetch_data.side_effect = None
+        mock_fetch_data.return_value = {"content": mocked_fetch_data()["content"][:1]}
+        call_command("sync_jotforms", "--full", stdout=StringIO())
+
+        self.assertEqual(
+            list(JotForm.objects.values_list("form_id", flat=True)),
+            ["202722038345045"],
+        )
+
+    @override_settings(WAGTAIL_JOTFORM={"SYNC_FORMS": True})
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_jot_form_choices_reads_synced_forms(self, mock_api):
+        now = timezone.now()
+        JotForm.objects.create(form_id="2", title="B form", synced_at=now)
+        JotForm.objects.create(form_id="1", title="A form", synced_at=now)
+        JotForm.objects.create(
+            form_id="3", title="Deleted", status=JotForm.Status.DELETED, synced_at=now
+        )
+
+        self.assertEqual(jot_form_choices(), [("1", "A form"), ("2", "B form")])
+        self.assertTrue(form_choice_exists("1"))
+        self.assertFalse(form_choice_exists("3"))
+        mock_api.assert_not_called()
+
+
+def submission(submission_id, form_id, created_at):
+    return {
+        "id": submission_id,
+        "form_id": form_id,
+        "status": "ACTIVE",
+        "created_at": created_at,
+        "answers": {"3": {"name": "email", "answer": "a@example.com"}},
+    }
+
+
+@override_settings(
+    WAGTAIL_JOTFORM={
+        "API_URL": "https://api.jotform.com",
+        "API_KEY": "valid-key",
+        "SUBMISSIONS_LIMIT": 2,
+    }
+)
+class TestSubmissionSync(TestCase):
+    def setUp(self):
+        self.pages = {
+            "1": [
+                submission("11", "1", "2020-10-10 10:00:00"),
+                submission("12", "1", "2020-10-10 11:00:00"),
+            ],
+            "2": [submission("21", "2", "2020-10-09 09:00:00")],
+        }
+
+    def fetch(self, url, headers, **params):
+        form_id = url.split("/")[-2]
+        content = self.pages.get(form_id)
+        if content is None:
+            raise CantPullFromAPI("Error pulling data from the API")
+        offset = params["offset"]
+        end = offset + params["limit"]
+        return {"content": content[offset:end]}
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_sync_copies_submissions_of_each_form(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fetch
+
+        counts, errors = sync_submissions(["1", "2"])
+
+        self.assertEqual(counts, {"1": 2, "2": 1})
+        self.assertEqual(errors, {})
+        # Form 1 filled a page, so its next page was requested
+        self.assertEqual(mock_fetch_data.call_count, 3)
+        submission = JotFormSubmission.objects.get(submission_id="12")
+        self.assertEqual(submission.form_id, "1")
+        self.assertEqual(submission.answers["3"]["answer"], "a@example.com")
+        state = JotFormSubmissionSyncState.objects.get(form_id="1")
+        self.assertEqual(state.last_created_at.isoformat(), "2020-10-10T11:00:00+00:00")
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_sync_resumes_from_high_water_mark(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fetch
+        sync_submissions(["1"])
+
+        self.pages["1"] = [submission("13", "1", "2020-10-11 08:00:00")]
+        counts, _ = sync_submissions(["1"])
+
+        self.assertEqual(counts, {"1": 1})
+        params = mock_fetch_data.call_args.kwargs
+        self.assertEqual(
+            json.loads(params["filter"]), {"created_at:gte": "2020-10-10 11:00:00"}
+        )
+        self.assertEqual(params["orderby"], "created_at")
+        self.assertEqual(JotFormSubmission.objects.count(), 3)
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_sync_fetches_submissions_made_in_the_same_second(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fetch
+        sync_submissions(["1"])
+
+        # Made in the same second as the newest stored submission, after the sync
+        self.pages["1"] = [
+            submission("12", "1", "2020-10-10 11:00:00"),
+            submission("13", "1", "2020-10-10 11:00:00"),
+        ]
+        sync_submissions(["1"])
+
+        self.assertTrue(JotFormSubmission.objects.filter(submission_id="13").exists())
+        self.assertEqual(JotFormSubmission.objects.count(), 3)
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_sync_replaces_webhook_submissions(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fetch
+        JotFormSubmission.objects.create(
+            submission_id="12",
+            form_id="1",
+            answers={"3": {"name": "email", "answer": "old@example.com"}},
+            created_at=timezone.now(),
+        )
+
+        sync_submissions(["1"])
+
+        submission = JotFormSubmission.objects.get(submission_id="12")
+        self.assertEqual(submission.created_at.isoformat(), "2020-10-10T11:00:00+00:00")
+        self.assertEqual(submission.answers["3"]["answer"], "a@example.com")
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_failed_form_keeps_its_high_water_mark(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fetch
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "sync_jotform_submissions",
+                "2",
+                "3",
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        self.assertTrue(JotFormSubmissionSyncState.objects.filter(form_id="2").exists())
+        self.assertFalse(
+            JotFormSubmissionSyncState.objects.filter(form_id="3").exists()
+        )
+        self.assertEqual(JotFormSubmission.objects.count(), 1)
+
+
+@override_settings(
+    WAGTAIL_JOTFORM={
+        "WEBHOOK_SECRET": "s3cret",
+        "WEBHOOK_BATCH_SIZE": 2,
+        "WEBHOOK_FLUSH_INTERVAL": 60,
+    }
+)
+class TestWebhook(TestCase):
+    url = "/jotform/webhook/?token=s3cret"
+
+    def setUp(self):
+        submission_buffer.flush()
+        self.executor = mock.patch.object(submission_buffer, "_get_executor").start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(submission_buffer.flush)
+
+    def post(self, submission_id, url=None):
+        return self.client.post(
+            url or self.url,
+            {
+                "formID": "1",
+                "submissionID": submission_id,
+                "rawRequest": json.dumps({"q3_email": "a@example.com"}),
+            },
+        )
+
+    def test_rejects_invalid_token(self):
+        response = self.post("11", url="/jotform/webhook/?token=wrong")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(submission_buffer), 0)
+
+    def test_submissions_are_buffered_then_flushed(self):
+        response = self.post("11")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(JotFormSubmission.objects.exists())
+        self.assertEqual(submission_buffer.flush(), 1)
+        submission = JotFormSubmission.objects.get(submission_id="11")
+        self.assertEqual(
+            submission.answers, {"3": {"name": "email", "answer": "a@example.com"}}
+        )
+
+    def test_compound_answers_are_exported_like_the_api(self):
+        submission = parse_webhook(
+            {
+                "formID": "1",
+                "submissionID": "11",
+                "rawRequest": json.dumps(
+                    {
+                        "slug": "submit/1",
+                        "event_id": "1_2",
+                        "timeToSubmit": "5",
+                        "path": "/submit/1",
+                        "q3_name": {"first": "Ada", "last": "Lovelace"},
+                        "q4_email": "a@example.com",
+                    }
+                ),
+            }
+        )
+
+        row = _row("11", submission.created_at, "ACTIVE", submission.answers)
+
+        self.assertEqual(
+            row["answers"],
+            {"name": {"first": "Ada", "last": "Lovelace"}, "email": "a@example.com"},
+        )
+
+    def test_full_batch_is_written_in_background(self):
+        self.post("11")
+        self.executor.return_value.submit.assert_not_called()
+        self.post("11")
+        self.post("12")
+
+        self.executor.return_value.submit.assert_called_once()
+        # Duplicate deliveries are skipped
+        self.assertEqual(submission_buffer.flush(), 3)
+        self.assertEqual(JotFormSubmission.objects.count(), 2)
 
     @override_settings(
         WAGTAIL_JOTFORM={
-            "API_KEY": "test_key",
-            "API_URL": "https://api.jotform.com/user/forms",
-            "LIMIT": 100,
+            "WEBHOOK_SECRET": "s3cret",
+            "WEBHOOK_BUFFER_LIMIT": 2,
+            "WEBHOOK_FLUSH_INTERVAL": 60,
         }
     )
-    def test_settings_available(self):
-        # Test that settings are available when defined in Django settings
-        self.assertEqual(wagtail_jotform_settings.API_KEY, "test_key")
-        self.assertEqual(
-            wagtail_jotform_settings.API_URL, "https://api.jotform.com/user/forms"
-        )
-        self.assertEqual(wagtail_jotform_settings.LIMIT, 100)
+    @mock.patch("wagtail_jotform.webhooks.threading.Timer")
+    def test_failed_write_is_retried_and_buffer_is_capped(self, mock_timer):
+        self.post("11")
+        self.post("12")
+        self.assertEqual(self.post("13").status_code, 503)
 
-    def test_page_renders_with_bad_settings(self):
-        response = self.client.get("/embeded-form-page/")
-        self.assertTemplateUsed(response, "wagtail_jotform/embedded_form_page.html")
-        self.assertEqual(response.render().status_code, 200)
+        with mock.patch.object(
+            JotFormSubmission.objects, "bulk_create", side_effect=DatabaseError
+        ):
+            self.assertEqual(submission_buffer.flush(), 0)
 
+        self.assertEqual(len(submission_buffer), 2)
+        # The timer is armed again to retry the write
+        self.assertEqual(mock_timer.return_value.start.call_count, 2)
+        self.assertEqual(submission_buffer.flush(), 2)
 
-class TestModels(TestCase):
+
+class TestExport(TestCase):
     fixtures = ["test.json"]
 
     def setUp(self):
-        self.default_site = Site.objects.get(is_default_site=True)
-        self.homepage = Page.objects.get(url_path="/home/")
-        self.embedded_form_page = self.homepage.add_child(
+        homepage = Page.objects.get(url_path="/home/")
+        self.page = homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+            )
+        )
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(user)
+
+    def export(self, export_format):
+        response = self.client.get(
+            reverse(
+                "wagtail_jotform_export_submissions", args=[self.page.pk, export_format]
+            )
+        )
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_export_reads_local_submissions(self):
+        JotFormSubmissionSyncState.objects.create(form_id="1")
+        JotFormSubmission.objects.create(
+            submission_id="11",
+            form_id="1",
+            status="ACTIVE",
+            answers={"3": {"name": "email", "answer": "a@example.com"}},
+            created_at=timezone.now(),
+        )
+
+        response, content = self.export("csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0], ["submission_id", "created_at", "status", "answers"])
+        self.assertEqual(rows[1][0], "11")
+        self.assertEqual(json.loads(rows[1][3]), {"email": "a@example.com"})
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "SUBMISSIONS_LIMIT": 1,
+        }
+    )
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_jsonl_export_pages_through_api(self, mock_fetch_data):
+        pages = [
+            [submission("11", "1", "2020-10-10 10:00:00")],
+            [submission("12", "1", "2020-10-10 11:00:00")],
+            [],
+        ]
+        mock_fetch_data.side_effect = lambda url, headers, **params: {
+            "content": pages[params["offset"]]
+        }
+
+        response, content = self.export("jsonl")
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["submission_id"] for row in rows], ["11", "12"])
+        self.assertEqual(rows[0]["created_at"], "2020-10-10 10:00:00")
+        self.assertEqual(mock_fetch_data.call_count, 3)
+        self.assertEqual(mock_fetch_data.call_args.kwargs["priority"], INTERACTIVE)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={"API_URL": "https://api.jotform.com", "API_KEY": "valid-key"}
+    )
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_export_ignores_unsynced_webhook_submissions(self, mock_fetch_data):
+        # Only stored by the webhook, so older submissions aren't stored
+        JotFormSubmission.objects.create(
+            submission_id="12", form_id="1", created_at=timezone.now()
+        )
+        mock_fetch_data.return_value = {
+            "content": [
+                submission("11", "1", "2020-10-10 10:00:00"),
+                submission("12", "1", "2020-10-10 11:00:00"),
+            ]
+        }
+
+        response, content = self.export("jsonl")
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["submission_id"] for row in rows], ["11", "12"])
+
+
+class TestEmbed(TestCase):
+    fixtures = ["test.json"]
+
+    def render(self, template_string):
+        return Template("{% load wagtail_jotform_tags %}" + template_string).render(
+            Context()
+        )
+
+    def test_page_keeps_script_embed_by_default(self):
+        homepage = Page.objects.get(url_path="/home/")
+        page = homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+            )
+        )
+
+        response = self.client.get(page.url)
+
+        self.assertContains(response, 'src="https://form.jotform.com/jsform/1"')
+
+    def test_script_embed_does_not_query_the_database(self):
+        with self.assertNumQueries(0):
+            html = self.render('{% jotform_embed "1" mode="script" %}')
+
+        self.assertIn('src="https://form.jotform.com/jsform/1"', html)
+
+    def test_lazy_iframe_reserves_synced_height(self):
+        JotForm.objects.create(
+            form_id="1", title="Newsletter", height=539, synced_at=timezone.now()
+        )
+
+        html = self.render('{% jotform_embed "1" mode="iframe" %}')
+
+        self.assertIn('src="https://form.jotform.com/1"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn("height: 539px", html)
+        self.assertIn('title="Newsletter"', html)
+
+    @override_settings(WAGTAIL_JOTFORM={"EMBED_MODE": "facade", "EMBED_HEIGHT": 400})
+    def test_facade_defers_loading_to_script(self):
+        html = self.render('{% jotform_embed "1" %}')
+
+        self.assertIn('data-jotform-embed="facade"', html)
+        self.assertIn("data-jotform-load", html)
+        self.assertIn("min-height: 400px", html)
+        self.assertIn("wagtail_jotform/js/embed.js", html)
+        self.assertNotIn("jsform", html)
+
+
+NATIVE_SETTINGS = {
+    "API_URL": "https://api.jotform.com",
+    "API_KEY": "key",
+    "EMBED_MODE": "native",
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM=NATIVE_SETTINGS)
+class TestNativeEmbed(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.updated_at = "2024-01-01 10:00:00"
+        self.questions = {
+            "1": {"qid": "1", "type": "control_head", "text": "Sign up", "order": "1"},
+            "2": {
+                "qid": "2",
+                "type": "control_email",
+                "name": "email",
+                "text": "Email",
+                "required": "Yes",
+                "order": "2",
+            },
+            "3": {
+                "qid": "3",
+                "type": "control_dropdown",
+                "name": "topic",
+                "text": "Topic",
+                "options": "News|Events",
+                "order": "3",
+            },
+            "4": {"qid": "4", "type": "control_button", "text": "Join", "order": "4"},
+        }
+
+    def fake_fetch_data(self, url, headers=None, **params):
+        if url.endswith("/questions"):
+            return {"content": self.questions}
+        if url.endswith("/properties"):
+            return {"content": {"title": "Newsletter"}}
+        return {"content": {"id": "1", "updated_at": self.updated_at}}
+
+    def render(self):
+        return Template(
+            '{% load wagtail_jotform_tags %}{% jotform_embed "1" %}'
+        ).render(Context())
+
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_renders_form_questions(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fake_fetch_data
+
+        html = self.render()
+
+        self.assertIn('action="https://submit.jotform.com/submit/1/"', html)
+        self.assertIn('aria-label="Newsletter"', html)
+        self.assertIn('<h2 class="jotform-native__heading">Sign up</h2>', html)
+        self.assertIn('type="email" id="input_1_2" name="q2_email"', html)
+        self.assertIn('<option value="Events">Events</option>', html)
+        self.assertIn(">Join</button>", html)
+        self.assertIn("wagtail_jotform/js/native-form.js", html)
+        self.assertNotIn("jsform", html)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={**NATIVE_SETTINGS, "FORM_SCHEMA_CHECK_INTERVAL": 0}
+    )
+    @mock.patch("wagtail_jotform.schema.refresh_in_background", side_effect=_refresh)
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_schema_is_refreshed_in_background(self, mock_fetch_data, mock_refresh):
+        mock_fetch_data.side_effect = self.fake_fetch_data
+        self.render()
+        self.assertEqual(mock_fetch_data.call_count, 3)
+        mock_refresh.assert_not_called()
+
+        # Only the form's version is checked while it's unchanged
+        self.render()
+        self.assertEqual(mock_fetch_data.call_count, 4)
+
+        self.updated_at = "2024-01-02 10:00:00"
+        self.questions["2"]["text"] = "Email address"
+        # The cached schema is served while the new one is fetched
+        self.assertNotIn("Email address", self.render())
+        self.assertEqual(mock_fetch_data.call_count, 7)
+        self.assertIn("Email address", self.render())
+
+    @mock.patch("wagtail_jotform.schema.refresh_in_background")
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_fresh_schema_is_not_checked(self, mock_fetch_data, mock_refresh):
+        mock_fetch_data.side_effect = self.fake_fetch_data
+        self.render()
+        self.render()
+
+        self.assertEqual(mock_fetch_data.call_count, 3)
+        mock_refresh.assert_not_called()
+
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_unsupported_forms_fall_back_to_iframe(self, mock_fetch_data):
+        mock_fetch_data.side_effect = self.fake_fetch_data
+        self.questions["5"] = {"qid": "5", "type": "control_signature", "order": "5"}
+
+        html = self.render()
+
+        self.assertIn('src="https://form.jotform.com/1"', html)
+        self.assertIn('loading="lazy"', html)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={**NATIVE_SETTINGS, "FORM_SCHEMA_CHECK_INTERVAL": 0}
+    )
+    @mock.patch("wagtail_jotform.schema.refresh_in_background", side_effect=_refresh)
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_stale_schema_is_used_if_api_fails(self, mock_fetch_data, mock_refresh):
+        mock_fetch_data.side_effect = self.fake_fetch_data
+        self.render()
+        mock_fetch_data.side_effect = CantPullFromAPI()
+
+        self.assertIn('name="q2_email"', self.render())
+        self.assertIn('name="q2_email"', self.render())
+
+    @mock.patch("wagtail_jotform.schema.fetch_data")
+    def test_failure_is_cached(self, mock_fetch_data):
+        mock_fetch_data.side_effect = CantPullFromAPI()
+
+        self.assertIn('loading="lazy"', self.render())
+        self.assertIn('loading="lazy"', self.render())
+        mock_fetch_data.assert_called_once()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM={"PAGE_CACHE_TIMEOUT": 60})
+class TestPageCache(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        cache.clear()
+        homepage = Page.objects.get(url_path="/home/")
+        self.page = homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+            )
+        )
+
+    def test_page_and_thank_you_route_are_cached(self):
+        thank_you_url = self.page.url + "thank-you/"
+        self.client.get(self.page.url)
+        self.client.get(thank_you_url)
+
+        with mock.patch("wagtail_jotform.models.render") as mock_render:
+            response = self.client.get(thank_you_url)
+
+        mock_render.assert_not_called()
+        self.assertContains(response, "Thank you")
+        self.assertNotContains(self.client.get(self.page.url), "Thank you")
+
+    @mock.patch("wagtail_jotform.wagtail_hooks.properties_changed", return_value=False)
+    def test_publish_and_unpublish_invalidate(self, mock_changed):
+        self.client.get(self.page.url)
+        self.page.title = "Renamed page"
+        self.page.save()
+        self.assertNotContains(self.client.get(self.page.url), "Renamed page")
+
+        do_after_publish_page(request=None, page=self.page)
+        self.assertContains(self.client.get(self.page.url), "Renamed page")
+
+        self.page.unpublish()
+        self.assertEqual(self.client.get(self.page.url).status_code, 404)
+
+    def test_deleting_the_page_drops_its_cache_version(self):
+        version_key = f"wagtail_jotform:page:{self.page.pk}:version"
+        get_page_version(self.page.pk)
+        self.assertIsNotNone(cache.get(version_key))
+
+        self.page.delete()
+        self.assertIsNone(cache.get(version_key))
+
+    def test_logged_in_users_are_not_cached(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(user)
+        self.client.get(self.page.url)
+
+        self.assertFalse([key for key in cache._cache if "wagtail_jotform:page" in key])
+
+
+class TestMetrics(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_api_calls_are_recorded(self):
+        client = get_client()
+        response = json_response({"content": [], "limit-left": 42})
+        with mock.patch.object(client.session, "request", return_value=response):
+            client.post("https://api.jotform.com/form/123/properties")
+        with mock.patch.object(client.session, "request", side_effect=Timeout):
+            with self.assertRaises(Timeout):
+                client.post("https://api.jotform.com/form/456/properties")
+
+        snapshot = metrics.snapshot()
+        stats = snapshot["api_calls"]["POST /form/{id}/properties"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["statuses"], {"200": 1, "Timeout": 1})
+        self.assertEqual(stats["bytes"], len(response.content))
+        self.assertEqual(snapshot["limit_left"], 42)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_choices_cache_results_are_counted(self, mock_api):
+        cache.clear()
+        local_cache.clear()
+        mock_api.return_value.get_data.return_value = mocked_fetch_data()
+
+        jot_form_choices()
+        jot_form_choices()
+        with mock.patch(
+            "wagtail_jotform.models.time.time", return_value=time.time() + 301
+        ):
+            with mock.patch("wagtail_jotform.models.refresh_in_background"):
+                jot_form_choices()
+
+        self.assertEqual(
+            metrics.snapshot()["cache"],
+            {
+                "jot_form_choices:v2:miss": 1,
+                "jot_form_choices:v2:hit": 1,
+                "jot_form_choices:v2:stale": 1,
+            },
+        )
+
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_publish_outcomes_are_counted(self, mock_push):
+        homepage = Page.objects.get(url_path="/home/")
+        page = homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", slug="embeded-form-page", form="1"
+            )
+        )
+
+        do_after_publish_page(request=None, page=page)
+        do_after_publish_page(request=None, page=page)
+
+        self.assertEqual(
+            metrics.snapshot()["publish"], {"succeeded": 1, "unchanged": 1}
+        )
+
+
+class TestProfiling(TestCase):
+    fixtures = ["test.json"]
+
+    def fake_request(self, method, url, **kwargs):
+        offset = int(url.partition("offset=")[2] or 0)
+        return json_response(
+            {
+                "content": [
+                    {"id": str(i), "title": f"Form {i}"}
+                    for i in range(offset, min(offset + 2, 5))
+                ],
+                "resultSet": {"offset": offset, "limit": 2, "count": 5},
+                "limit-left": 900,
+            }
+        )
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+        }
+    )
+    def test_records_calls_from_page_threads(self):
+        client = get_client()
+        with mock.patch.object(client.session, "request", self.fake_request):
+            with record_calls() as recorder:
+                jot_form_choices()
+
+        calls = recorder.get_calls("api")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual({call["status"] for call in calls}, {200})
+        self.assertTrue(all(call["size"] for call in calls))
+        self.assertEqual(recorder.get_calls("cache")[0]["source"], "miss")
+
+    def test_nothing_is_recorded_outside_a_request(self):
+        self.assertIsNone(get_recorder())
+        with record_calls():
+            self.assertIsNotNone(get_recorder())
+        self.assertIsNone(get_recorder())
+
+    @override_settings(
+        MIDDLEWARE=settings.MIDDLEWARE
+        + ["wagtail_jotform.middleware.ServerTimingMiddleware"],
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+            "PROFILE_REQUESTS": True,
+        },
+    )
+    def test_server_timing_header(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(user)
+        client = get_client()
+
+        with mock.patch.object(client.session, "request", self.fake_request):
+            response = self.client.get(reverse("wagtail_jotform_search_forms"))
+
+        self.assertIn('desc="Jotform API (3)"', response["Server-Timing"])
+        self.assertIn(
+            'jotform-cache;desc="Form choices miss"', response["Server-Timing"]
+        )
+
+    @override_settings(
+        MIDDLEWARE=settings.MIDDLEWARE
+        + ["wagtail_jotform.middleware.ServerTimingMiddleware"]
+    )
+    @mock.patch("wagtail_jotform.models.jot_form_choices", return_value=[])
+    def test_no_header_while_disabled(self, mock_choices):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("wagtail_jotform_search_forms"))
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+        }
+    )
+    def test_debug_toolbar_panel(self):
+        def get_response(request):
+            jot_form_choices()
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        toolbar = DebugToolbar(request, get_response)
+        panel = JotFormPanel(toolbar, get_response)
+        client = get_client()
+
+        with mock.patch.object(client.session, "request", self.fake_request):
+            response = panel.process_request(request)
+        panel.generate_stats(request, response)
+
+        self.assertEqual(panel.get_stats()["api_count"], 3)
+        self.assertRegex(panel.nav_subtitle, r"^3 API calls in [\d.]+ms$")
+        content = panel.content
+        self.assertIn("3 API calls", content)
+        self.assertIn("<td>api</td>", content)
+        self.assertIn("<td>miss</td>", content)
+
+
+ACCOUNTS_SETTINGS = {
+    "API_URL": "https://api.jotform.com",
+    "API_KEY": "default-key",
+    "ACCOUNTS": {"eu": {"API_URL": "https://eu-api.jotform.com", "API_KEY": "eu-key"}},
+    "SITE_ACCOUNTS": {"localhost": "eu"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, WAGTAIL_JOTFORM=ACCOUNTS_SETTINGS)
+class TestAccounts(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        homepage = Page.objects.get(url_path="/home/")
+        self.page = homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", slug="embeded-form-page", form="1"
+            )
+        )
+
+    def fake_get_data(self):
+        key = wagtail_jotform_settings.API_KEY
+        return {"content": [{"id": key, "title": f"Form of {key}"}]}
+
+    def test_settings_are_scoped_to_account(self):
+        with using_account("eu"):
+            self.assertEqual(
+                wagtail_jotform_settings.API_URL, "https://eu-api.jotform.com"
+            )
+            self.assertEqual(wagtail_jotform_settings.LIMIT, 50)
+        with using_account("other"):
+            self.assertIsNone(wagtail_jotform_settings.API_KEY)
+        self.assertEqual(wagtail_jotform_settings.API_KEY, "default-key")
+        self.assertEqual(get_account_names(), ["default", "eu"])
+
+    def test_clients_and_budgets_are_isolated(self):
+        default_client = get_client()
+        rate_limit_scheduler.record({"limit-left": 10})
+        with using_account("eu"):
+            self.assertIsNot(get_client(), default_client)
+            self.assertNotEqual(
+                get_client().circuit_breaker.failures_key,
+                default_client.circuit_breaker.failures_key,
+            )
+            self.assertIsNone(get_rate_limit_budget())
+        self.assertEqual(get_rate_limit_budget(), 10)
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_choices_are_cached_per_account(self, mock_api):
+        mock_api.return_value.get_data.side_effect = self.fake_get_data
+
+        self.assertEqual(jot_form_choices(), [("default-key", "Form of default-key")])
+        with using_account("eu"):
+            self.assertEqual(jot_form_choices(), [("eu-key", "Form of eu-key")])
+        self.assertEqual(jot_form_choices(), [("default-key", "Form of default-key")])
+        self.assertEqual(mock_api.return_value.get_data.call_count, 2)
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_admin_form_uses_page_account(self, mock_api):
+        mock_api.return_value.get_data.side_effect = self.fake_get_data
+        form_class = EmbeddedFormPage.get_edit_handler().get_form_class()
+        form = form_class(instance=self.page, for_user=None)
+
+        self.assertEqual(form.jotform_account, "eu")
+        self.assertIn("account=eu", form["form"].as_widget())
+        form.cleaned_data = {"form": "eu-key"}
+        self.assertEqual(form.clean_form(), "eu-key")
+        form.cleaned_data = {"form": "default-key"}
+        with self.assertRaises(ValidationError):
+            form.clean_form()
+
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_publish_hook_uses_page_account(self, mock_push):
+        mock_push.side_effect = lambda *args: self.assertEqual(
+            wagtail_jotform_settings.API_KEY, "eu-key"
+        )
+
+        do_after_publish_page(request=None, page=self.page)
+
+        mock_push.assert_called_once()
+
+    @mock.patch("wagtail_jotform.sync.fetch_data")
+    def test_submissions_are_synced_with_page_account(self, mock_fetch_data):
+        mock_fetch_data.return_value = {"content": []}
+
+        sync_submissions()
+
+        url, headers = mock_fetch_data.call_args.args
+        self.assertEqual(url, "https://eu-api.jotform.com/form/1/submissions")
+        self.assertEqual(headers, {"APIKEY": "eu-key"})
+
+    @mock.patch("wagtail_jotform.publishing.push_form_properties")
+    def test_moving_site_to_another_account_pushes_again(self, mock_push):
+        do_after_publish_page(request=None, page=self.page)
+        with override_settings(
+            WAGTAIL_JOTFORM={**ACCOUNTS_SETTINGS, "SITE_ACCOUNTS": {}}
+        ):
+            do_after_publish_page(request=None, page=self.page)
+
+        self.assertEqual(mock_push.call_count, 2)
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_warm_cache_command(self, mock_api):
+        mock_api.return_value.get_data.side_effect = self.fake_get_data
+        out = StringIO()
+
+        call_command("warm_jotform_cache", stdout=out)
+
+        self.assertIn("default: 1 form choices cached.", out.getvalue())
+        self.assertIn("eu: 1 form choices cached.", out.getvalue())
+        mock_api.return_value.get_data.reset_mock()
+        with using_account("eu"):
+            self.assertEqual(jot_form_choices(), [("eu-key", "Form of eu-key")])
+        mock_api.return_value.get_data.assert_not_called()
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_warm_cache_command_fails(self, mock_api):
+        mock_api.return_value.get_data.side_effect = CantPullFromAPI()
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "warm_jotform_cache", "eu", stdout=StringIO(), stderr=StringIO()
+            )
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_warm_cache_command_rejects_unknown_accounts(self, mock_api):
+        with self.assertRaisesMessage(CommandError, "Unknown accounts: typo"):
+            call_command(
+                "warm_jotform_cache", "eu", "typo", stdout=StringIO(), stderr=StringIO()
+            )
+        mock_api.assert_not_called()
+
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_refresh_skips_fresh_choices(self, mock_api):
+        mock_api.return_value.get_data.side_effect = self.fake_get_data
+        jot_form_choices()
+        mock_api.return_value.get_data.reset_mock()
+
+        results = warm_form_choices(stale_within=60)
+
+        self.assertEqual(results, {"default": 1, "eu": 1})
+        # Only the eu account had nothing cached
+        mock_api.return_value.get_data.assert_called_once()
+        warm_form_choices(stale_within=wagtail_jotform_settings.CHOICES_SOFT_TTL + 1)
+        self.assertEqual(mock_api.return_value.get_data.call_count, 3)
+
+
+class TestFormChooser(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", None
+        )
+        self.client.force_login(self.user)
+        self.choices = [
+            ("11", "Newsletter signup"),
+            ("12", "Event signup"),
+            ("21", "Signup for news"),
+            ("22", "Contact"),
+        ]
+
+    def search(self, **params):
+        return self.client.get(reverse("wagtail_jotform_search_forms"), params).json()
+
+    def test_search_ranks_title_prefix_matches_first(self):
+        with mock.patch(
+            "wagtail_jotform.models.jot_form_choices", return_value=self.choices
+        ):
+            data = self.search(q="signup")
+
+        self.assertEqual([form["id"] for form in data["results"]], ["21", "11", "12"])
+        self.assertFalse(data["has_next"])
+
+    @override_settings(WAGTAIL_JOTFORM={"CHOOSER_PAGE_SIZE": 2})
+    def test_search_is_paginated(self):
+        with mock.patch(
+            "wagtail_jotform.models.jot_form_choices", return_value=self.choices
+        ):
+            first_page = self.search()
+            second_page = self.search(p=2)
+
+        self.assertEqual([form["id"] for form in first_page["results"]], ["11", "12"])
+        self.assertTrue(first_page["has_next"])
+        self.assertEqual([form["id"] for form in second_page["results"]], ["21", "22"])
+        self.assertFalse(second_page["has_next"])
+
+    @override_settings(WAGTAIL_JOTFORM={"SYNC_FORMS": True, "CHOOSER_PAGE_SIZE": 2})
+    def test_search_synced_forms(self):
+        now = timezone.now()
+        for form_id, title in self.choices:
+            JotForm.objects.create(form_id=form_id, title=title, synced_at=now)
+
+        data = self.search(q="2")
+        self.assertEqual([form["id"] for form in data["results"]], ["22", "21"])
+
+        data = self.search(q="signup")
+        self.assertEqual([form["id"] for form in data["results"]], ["21", "12"])
+        self.assertTrue(data["has_next"])
+
+    def test_search_requires_admin_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("wagtail_jotform_search_forms"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_form_choice_validation(self):
+        homepage = Page.objects.get(url_path="/home/")
+        page = homepage.add_child(
+            instance=EmbeddedFormPage(title="Form", slug="form", form="99")
+        )
+        with mock.patch(
+            "wagtail_jotform.models.jot_form_choices", return_value=self.choices
+        ):
+            self.assertTrue(form_choice_exists("11"))
+            self.assertFalse(form_choice_exists("99"))
+
+            response = self.client.get(f"/admin/pages/{page.pk}/edit/")
+            self.assertContains(response, "data-jotform-chooser")
+            self.assertContains(response, "wagtail_jotform/js/form-chooser.js")
+
+            form = EmbeddedFormPage.get_edit_handler().get_form_class()(
+                instance=page, for_user=self.user
+            )
+            form.cleaned_data = {"form": "99"}
+            self.assertEqual(form.clean_form(), "99")
+            form.cleaned_data = {"form": "98"}
+            with self.assertRaises(ValidationError):
+                form.clean_form()
+
+
+def chunked(data, size):
+    body = json.dumps(data, ensure_ascii=False).encode()
+    chunks = []
+    for start in range(0, len(body), size):
+        end = start + size
+        chunks.append(body[start:end])
+    return chunks
+
+
+def streamed_response(data, size=7):
+    response = mock.MagicMock()
+    response.iter_content.return_value = chunked(data, size)
+    return response
+
+
+class TestStreaming(TestCase):
+    def test_iter_json_content(self):
+        data = {
+            "responseCode": 200,
+            "content": [
+                {"id": "1", "title": "Café form", "height": 539, "nested": {"a": [1]}},
+                {"id": "2", "title": 'Form, with "quotes"', "height": 1234567},
+            ],
+            "resultSet": {"offset": 0, "limit": 2, "count": 2},
+            "limit-left": 978,
+        }
+        for size in (1, 3, 64):
+            meta = {}
+            with self.subTest(size=size):
+                items = list(
+                    iter_json_content(chunked(data, size), ("id", "title"), meta)
+                )
+                self.assertEqual(
+                    items,
+                    [
+                        {"id": "1", "title": "Café form"},
+                        {"id": "2", "title": 'Form, with "quotes"'},
+                    ],
+                )
+                self.assertEqual(meta["limit-left"], 978)
+                self.assertEqual(meta["resultSet"]["count"], 2)
+
+        self.assertEqual(
+            list(iter_json_content(chunked(data, 5)))[1]["height"], 1234567
+        )
+        self.assertEqual(list(iter_json_content([b'{"content": []}'])), [])
+
+    def test_iter_json_content_invalid(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_content([b'{"content": [{"id": 1}']))
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_stream_content(self, mock_get):
+        cache.clear()
+        mock_get.return_value = streamed_response(mocked_fetch_data())
+
+        items = list(
+            stream_content("https://api.jotform.com/user/forms", fields=["id"])
+        )
+
+        self.assertEqual(items, [{"id": "202722038345045"}, {"id": "202721468649058"}])
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        mock_get.return_value.close.assert_called_once()
+        self.assertEqual(get_rate_limit_budget(), 978)
+
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_stream_content_errors(self, mock_get):
+        mock_get.side_effect = Timeout
+        with self.assertRaises(CantPullFromAPI):
+            list(stream_content("https://api.jotform.com/user/forms"))
+
+        mock_get.side_effect = None
+        mock_get.return_value.iter_content.return_value = [b"<html>"]
+        with self.assertRaises(CantPullFromAPI):
+            list(stream_content("https://api.jotform.com/user/forms"))
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://api.jotform.com",
+            "API_KEY": "valid-key",
+            "LIMIT": 2,
+            "STREAM_RESPONSES": True,
+        }
+    )
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_jot_form_choices_streams_every_page(self, mock_get):
+        def fake_get(url, **kwargs):
+            offset = int(url.partition("offset=")[2] or 0)
+            return streamed_response(
+                {
+                    "content": [
+                        {"id": str(i), "title": f"Form {i}", "height": "539"}
+                        for i in range(offset, min(offset + 2, 5))
+                    ],
+                    "resultSet": {"offset": offset, "limit": 2, "count": 5},
+                }
+            )
+
+        mock_get.side_effect = fake_get
+
+        self.assertEqual(jot_form_choices(), [(str(i), f"Form {i}") for i in range(5)])
+        self.assertEqual(mock_get.call_count, 3)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    WAGTAIL_JOTFORM={
+        "RATE_LIMIT_RESERVE": 100,
+        "RATE_LIMIT_SLOW_THRESHOLD": 1000,
+        "RATE_LIMIT_MAX_DELAY": 4,
+    },
+)
+class TestRateLimitScheduler(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_budget_is_recorded_from_responses(self, mock_get):
+        mock_get.return_value = json_response(mocked_fetch_data())
+
+        fetch_data("https://api.jotform.com/user/forms")
+
+        self.assertEqual(get_rate_limit_budget(), 978)
+
+    @mock.patch("wagtail_jotform.utils.time.sleep")
+    def test_background_calls_slow_down_then_defer(self, mock_sleep):
+        rate_limit_scheduler.record({"limit-left": 550})
+        rate_limit_scheduler.acquire(BACKGROUND)
+        mock_sleep.assert_called_once_with(2.0)
+
+        rate_limit_scheduler.record({"limit-left": 100})
+        with self.assertRaises(RateLimitDeferred):
+            rate_limit_scheduler.acquire(BACKGROUND)
+
+    @mock.patch("wagtail_jotform.utils.time.sleep")
+    @mock.patch("wagtail_jotform.client.JotFormClient.get")
+    def test_interactive_calls_are_not_held_back(self, mock_get, mock_sleep):
+        rate_limit_scheduler.record({"limit-left": 1})
+        mock_get.return_value = json_response({"limit-left": 0})
+
+        fetch_data("https://api.jotform.com/user/forms")
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(get_rate_limit_budget(), 0)
+        with self.assertRaises(RateLimitDeferred):
+            fetch_data("https://api.jotform.com/user/forms", priority=BACKGROUND)
+
+
+class TestSettings(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        self.default_site = Site.objects.get(is_default_site=True)
+        self.homepage = Page.objects.get(url_path="/home/")
+        self.embedded_form_page = self.homepage.add_child(
+            instance=EmbeddedFormPage(
+                title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
+            )
+        )
+
+    def test_settings(self):
+        del settings.WAGTAIL_JOTFORM
+        self.assertFalse(wagtail_jotform_settings.API_KEY)
+        self.assertFalse(wagtail_jotform_settings.API_URL)
+        self.assertTrue(wagtail_jotform_settings.LIMIT)
+
+    @override_settings(
+        WAGTAIL_JOTFORM={
+            "API_KEY": "test_key",
+            "API_URL": "https://api.jotform.com/user/forms",
+            "LIMIT": 100,
+        }
+    )
+    def test_settings_available(self):
+        # Test that settings are available when defined in Django settings
+        self.assertEqual(wagtail_jotform_settings.API_KEY, "test_key")
+        self.assertEqual(
+            wagtail_jotform_settings.API_URL, "https://api.jotform.com/user/forms"
+        )
+        self.assertEqual(wagtail_jotform_settings.LIMIT, 100)
+
+    def test_page_renders_with_bad_settings(self):
+        response = self.client.get("/embeded-form-page/")
+        self.assertTemplateUsed(response, "wagtail_jotform/embedded_form_page.html")
+        self.assertEqual(response.render().status_code, 200)
+
+
+class TestModels(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        self.default_site = Site.objects.get(is_default_site=True)
+        self.homepage = Page.objects.get(url_path="/home/")
+        self.embedded_form_page = self.homepage.add_child(
             instance=EmbeddedFormPage(
                 title="Embedded Form Page", depth=3, slug="embeded-form-page", form="1"
             )
@@ -497,7 +2223,139 @@ class TestModels(TestCase):
 
         # Verify the result
         self.assertEqual(choices, [("1", "Form 1"), ("2", "Form 2")])
-        mock_api_instance.fetch_from_api.assert_called_once()
+        mock_api_instance.get_data.assert_called_once()
+        mock_api_instance.fetch_from_api.assert_not_called()
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_jot_form_choices_concurrent_misses_fetch_once(self, mock_api):
+        """Test concurrent cache misses in one process share a single fetch."""
+        cache.clear()
+
+        def slow_get_data():
+            time.sleep(0.2)
+            return {"content": [{"id": "1", "title": "Form 1"}]}
+
+        mock_api.return_value.get_data.side_effect = slow_get_data
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: jot_form_choices(), range(5)))
+
+        self.assertEqual(results, [[("1", "Form 1")]] * 5)
+        mock_api.return_value.get_data.assert_called_once()
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_jot_form_choices_waits_for_other_process(self, mock_api):
+        """Test a miss reuses the result of a refresh running in another process."""
+        cache.clear()
+        cache.add(f"{CHOICES_CACHE_KEY}:lock", "another-process")
+
+        def other_process_finishes(seconds):
+            cache.set(
+                CHOICES_CACHE_KEY,
+                {"choices": [("1", "Form 1")], "refresh_at": time.time() + 300},
+            )
+
+        with mock.patch(
+            "wagtail_jotform.cache.time.sleep", side_effect=other_process_finishes
+        ):
+            choices = jot_form_choices()
+
+        self.assertEqual(choices, [("1", "Form 1")])
+        mock_api.return_value.get_data.assert_not_called()
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://test.com",
+            "API_KEY": "test-key",
+            "CHOICES_NEGATIVE_TTL": 10,
+        },
+    )
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_failed_fetch_is_cached_briefly(self, mock_api):
+        """Test a failure to reach the API is cached for the negative TTL."""
+        cache.clear()
+        mock_api.return_value.get_data.return_value = {}
+
+        self.assertEqual(jot_form_choices(), [])
+        self.assertEqual(jot_form_choices(), [])
+
+        mock_api.return_value.get_data.assert_called_once()
+        entry = cache.get(CHOICES_CACHE_KEY)
+        self.assertAlmostEqual(entry["refresh_at"], time.time() + 10, delta=5)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={"API_URL": "https://test.com", "API_KEY": "test-key"},
+    )
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_failed_refresh_keeps_stale_choices(self, mock_api):
+        """Test stale choices are kept when a refresh fails."""
+        cache.clear()
+        cache.set(
+            CHOICES_CACHE_KEY,
+            {"choices": [("1", "Old form")], "refresh_at": time.time() - 1},
+        )
+        mock_api.return_value.get_data.return_value = {}
+
+        self.assertEqual(_fetch_form_choices(), [("1", "Old form")])
+        self.assertEqual(cache.get(CHOICES_CACHE_KEY)["choices"], [("1", "Old form")])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("wagtail_jotform.models.refresh_in_background")
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_jot_form_choices_serves_stale_choices(self, mock_api, mock_refresh):
+        """Test choices past their soft TTL are served while being refreshed."""
+        cache.clear()
+        cache.set(
+            CHOICES_CACHE_KEY,
+            {"choices": [("1", "Old form")], "refresh_at": time.time() - 1},
+        )
+
+        self.assertEqual(jot_form_choices(), [("1", "Old form")])
+        mock_api.return_value.get_data.assert_not_called()
+        mock_refresh.assert_called_once_with(CHOICES_CACHE_KEY, mock.ANY)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        WAGTAIL_JOTFORM={
+            "API_URL": "https://test.com",
+            "API_KEY": "test-key",
+            "CHOICES_SOFT_TTL": 60,
+            "CHOICES_HARD_TTL": 600,
+        },
+    )
+    @mock.patch("wagtail_jotform.models.JotFormAPI")
+    def test_jot_form_choices_background_refresh(self, mock_api):
+        """Test a background refresh replaces stale choices."""
+        cache.clear()
+        mock_api.return_value.get_data.return_value = {
+            "content": [{"id": "1", "title": "New form"}]
+        }
+
+        future = refresh_in_background(CHOICES_CACHE_KEY, _fetch_form_choices)
+        future.result()
+
+        entry = cache.get(CHOICES_CACHE_KEY)
+        self.assertEqual(entry["choices"], [("1", "New form")])
+        self.assertAlmostEqual(entry["refresh_at"], time.time() + 60, delta=5)
+
+    def test_refresh_in_background_deduplicates(self):
+        """Test a refresh isn't scheduled while one is already pending."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            started.set()
+            release.wait(5)
+
+        future = refresh_in_background("test-key", fetch)
+        started.wait(5)
+        self.assertIsNone(refresh_in_background("test-key", fetch))
+        release.set()
+        future.result()
 
     def test_thank_you_page_route(self):
         """Test the thank you page route renders correctly."""
@@ -521,6 +2379,7 @@ class TestModels(TestCase):
             # Configure mocks
             mock_settings.API_URL = "https://test.com"
             mock_settings.API_KEY = "test_key"
+            mock_settings.STREAM_RESPONSES = False
 
             mock_api_instance = mock_api.return_value
             mock_api_instance.get_data.return_value = {
@@ -535,7 +2394,8 @@ class TestModels(TestCase):
 
             # Check results
             self.assertEqual(choices, [("1", "Form 1"), ("2", "Form 2")])
-            mock_api_instance.fetch_from_api.assert_called_once()
+            mock_api_instance.get_data.assert_called_once()
+            mock_api_instance.fetch_from_api.assert_not_called()
 
     def test_form_widget_choices_assignment(self):
         """Test the assignment of choices to form widget in admin form."""
@@ -9,6 +9,7 @@ private_urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
+    path("jotform/", include("wagtail_jotform.urls")),
 ]
 
 urlpatterns = [path("", include(wagtail_urls))]
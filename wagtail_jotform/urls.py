@@ -0,0 +1,7 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("webhook/", views.receive_webhook, name="wagtail_jotform_webhook"),
+]
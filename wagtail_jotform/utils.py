@@ -1,12 +1,23 @@
+import codecs
+import hashlib
+import json
 import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
 
-import requests
 from requests.exceptions import ConnectionError, HTTPError, MissingSchema, Timeout
 from urllib3.exceptions import MaxRetryError
 
+from .accounts import account_key
+from .client import CircuitOpen, get_client
+from .profiling import in_current_context
 from .settings import wagtail_jotform_settings
 
-logging.basicConfig(level=logging.CRITICAL)
 logger = logging.getLogger(__name__)
 
 
@@ -14,10 +25,155 @@ class CantPullFromAPI(Exception):
     pass
 
 
-def fetch_data(url, headers=None, **params):
+class RateLimitDeferred(CantPullFromAPI):
+    pass
+
+
+# Priorities for API calls, used by the `RateLimitScheduler`
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class RateLimitScheduler:
+    """
+    Track the daily request budget Jotform reports as `limit-left`, and hold
+    back background API calls as it runs low so editors can keep working.
+
+    Below `RATE_LIMIT_SLOW_THRESHOLD` background calls are delayed by up to
+    `RATE_LIMIT_MAX_DELAY` seconds, increasing as the budget shrinks. At or
+    below `RATE_LIMIT_RESERVE` they are deferred by raising
+    `RateLimitDeferred`. Interactive calls are never held back.
+    """
+
+    # Forget the budget if no responses are seen for an hour, as it resets daily
+    cache_timeout = 3600
+
+    @property
+    def cache_key(self):
+        # Each account has its own budget
+        return account_key("wagtail_jotform:limit_left")
+
+    def get_budget(self):
+        return cache.get(self.cache_key)
+
+    def record(self, data):
+        if not isinstance(data, dict) or data.get("limit-left") is None:
+            return
+        try:
+            budget = int(data["limit-left"])
+        except (TypeError, ValueError):
+            return
+        cache.set(self.cache_key, budget, timeout=self.cache_timeout)
+
+    def acquire(self, priority=INTERACTIVE):
+        if priority == INTERACTIVE or (budget := self.get_budget()) is None:
+            return
+
+        reserve = wagtail_jotform_settings.RATE_LIMIT_RESERVE
+        slow_threshold = wagtail_jotform_settings.RATE_LIMIT_SLOW_THRESHOLD
+        if budget <= reserve:
+            raise RateLimitDeferred(
+                f"Deferring background request, only {budget} API requests left"
+            )
+        if budget < slow_threshold:
+            scale = (slow_threshold - budget) / (slow_threshold - reserve)
+            time.sleep(wagtail_jotform_settings.RATE_LIMIT_MAX_DELAY * scale)
+
+
+rate_limit_scheduler = RateLimitScheduler()
+
+
+def get_rate_limit_budget():
+    """
+    Return the number of API requests Jotform last reported as left for the
+    day for the current account, or `None` if it isn't known.
+    """
+    return rate_limit_scheduler.get_budget()
+
+
+def _response_cache_key(url, headers, params):
+    # Headers are included as they hold the API key, so accounts aren't mixed
+    request = json.dumps([url, headers, params], sort_keys=True, default=str)
+    return f"wagtail_jotform:response:{hashlib.sha256(request.encode()).hexdigest()}"
+
+
+def _is_response_cached(url, params):
+    if not wagtail_jotform_settings.RESPONSE_CACHE_TIMEOUT:
+        return False
+    # Filtered requests, such as incremental syncs, change with every watermark
+    if "filter" in params:
+        return False
+    path = urlsplit(url).path
+    return any(
+        endpoint in path
+        for endpoint in wagtail_jotform_settings.RESPONSE_CACHE_ENDPOINTS
+    )
+
+
+# The fields of a response body that change on every call
+RESPONSE_METADATA = re.compile(rb'"(duration|limit-left)"\s*:\s*("[^"]*"|[-\d.]+)')
+
+
+def _hash_content(body):
+    """
+    Return the hash of the raw `body` of a response without its `duration` and
+    `limit-left` fields, and the values of those fields.
+    """
+    metadata = {}
+
+    def strip(match):
+        name, value = match.groups()
+        metadata[name.decode()] = json.loads(value)
+        return b""
+
+    content = RESPONSE_METADATA.sub(strip, body)
+    return hashlib.sha256(content).hexdigest(), metadata
+
+
+def _parse_response(response, cache_key, cached):
+    """
+    Return the parsed body of `response`, reusing the cached parsed body if
+    it's unchanged.
+
+    Unchanged bodies are detected from the API's validators, or by hashing the
+    raw body without the fields that change on every call, so the body is
+    only parsed when it has changed. The cache is only written when the body
+    or its validators have changed.
+    """
+    if cached is not None and response.status_code == 304:
+        return cached["data"]
+    if cache_key is None:
+        return response.json()
+
+    content_hash, metadata = _hash_content(response.content)
+    entry = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "hash": content_hash,
+    }
+    if cached is not None and all(cached[key] == value for key, value in entry.items()):
+        data = cached["data"]
+        return {**data, **metadata} if isinstance(data, dict) else data
+
+    data = response.json()
+    cache.set(
+        cache_key,
+        {**entry, "data": data},
+        timeout=wagtail_jotform_settings.RESPONSE_CACHE_TIMEOUT,
+    )
+    return data
+
+
+@contextmanager
+def _handle_api_errors(url):
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
+        yield
+    except CantPullFromAPI:
+        raise
+    except CircuitOpen:
+        # Don't log a traceback for every request made during an outage
+        logger.warning(f"Circuit breaker is open, not fetching data from {url}")
+        raise CantPullFromAPI(f"Error occured when fetching data from {url}")
     except Timeout:
         logger.exception(f"Timeout error occurred when fetching data from {url}")
         raise CantPullFromAPI(f"Error occured when fetching data from {url}")
@@ -33,11 +189,165 @@ def fetch_data(url, headers=None, **params):
     except Exception:
         logger.exception(f"Exception occured when fetching data from {url}")
         raise CantPullFromAPI(f"Error occured when fetching data from {url}")
-    else:
-        return response.json()
 
 
-def fetch_jotform_data():
+def fetch_data(url, headers=None, *, priority=INTERACTIVE, **params):
+    rate_limit_scheduler.acquire(priority)
+
+    cache_key = None
+    cached = None
+    request_headers = dict(headers or {})
+    if _is_response_cached(url, params):
+        cache_key = _response_cache_key(url, headers, params)
+        cached = cache.get(cache_key)
+    if cached is not None:
+        # Ask the API to only send the body if it has changed
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    with _handle_api_errors(url):
+        response = get_client().get(url, params=params, headers=request_headers)
+        response.raise_for_status()
+
+    data = _parse_response(response, cache_key, cached)
+    if response.status_code != 304:
+        rate_limit_scheduler.record(data)
+    return data
+
+
+class _JSONStreamReader:
+    """
+    Read JSON values one at a time from an iterable of byte chunks, holding
+    only the part of the document that hasn't been read yet.
+    """
+
+    decoder = json.JSONDecoder()
+    whitespace = " \t\r\n"
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _read_more(self):
+        if self.exhausted:
+            return False
+        try:
+            text = self.text_decoder.decode(next(self.chunks))
+        except StopIteration:
+            self.exhausted = True
+            text = self.text_decoder.decode(b"", final=True)
+        # Drop the part of the buffer that has already been read
+        pos = self.pos
+        self.buffer = self.buffer[pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Return the next non-whitespace character, or "" at the end.
+        """
+        while True:
+            while (
+                self.pos < len(self.buffer) and self.buffer[self.pos] in self.whitespace
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char):
+        if (found := self.peek()) != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._read_more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_content(chunks, fields=None, meta=None):
+    """
+    Yield the items of the top-level `content` list of the JSON object read
+    from `chunks`, as each one is parsed. If `fields` is given, items are
+    reduced to those keys. Other top-level values are added to `meta`.
+    """
+    reader = _JSONStreamReader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "content" and reader.peek() == "[":
+            reader.expect("[")
+            while reader.peek() != "]":
+                item = reader.value()
+                if fields is not None:
+                    item = {field: item.get(field) for field in fields}
+                yield item
+                if reader.peek() == ",":
+                    reader.expect(",")
+            reader.expect("]")
+        else:
+            value = reader.value()
+            if meta is not None:
+                meta[key] = value
+
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
+
+
+def stream_content(
+    url, headers=None, fields=None, *, meta=None, priority=INTERACTIVE, **params
+):
+    """
+    Yield the items of the `content` list of an API response as they are read,
+    optionally reduced to `fields`, so the whole response is never held in
+    memory. The response's other top-level values are added to `meta`.
+
+    Unlike `fetch_data`, streamed responses aren't cached.
+    """
+    rate_limit_scheduler.acquire(priority)
+    meta = meta if meta is not None else {}
+
+    with _handle_api_errors(url):
+        response = get_client().get(url, params=params, headers=headers, stream=True)
+        response.raise_for_status()
+        try:
+            yield from iter_json_content(
+                response.iter_content(
+                    chunk_size=wagtail_jotform_settings.STREAM_CHUNK_SIZE
+                ),
+                fields,
+                meta,
+            )
+        finally:
+            response.close()
+
+    rate_limit_scheduler.record(meta)
+
+
+def _get_api_config():
     limit = getattr(wagtail_jotform_settings, "LIMIT", 50)
     api_url = getattr(wagtail_jotform_settings, "API_URL", "")
     api_key = getattr(wagtail_jotform_settings, "API_KEY", "")
@@ -55,7 +365,122 @@ def fetch_jotform_data():
         logger.error("API_KEY is not set in settings.")
         return None
 
-    return fetch_data(f"{api_url}/user/forms?limit={limit}", {"APIKEY": api_key})
+    return api_url, api_key, limit
+
+
+def _forms_url(api_url, limit, offset=0):
+    url = f"{api_url}/user/forms?limit={limit}"
+    if offset:
+        url = f"{url}&offset={offset}"
+    return url
+
+
+def _remaining_offsets(page, limit):
+    result_set = page.get("resultSet") or {}
+    try:
+        count = int(result_set.get("count", 0))
+        limit = int(result_set.get("limit") or limit)
+    except (TypeError, ValueError):
+        return []
+    if limit <= 0:
+        return []
+    return list(range(limit, count, limit))
+
+
+def iter_jotform_pages(**params):
+    """
+    Yield every page of the `/user/forms` listing, in order. Any `params`, such
+    as `filter` or `orderby`, are added to each request, and a `priority` is
+    passed on to `fetch_data`.
+
+    The first page is fetched on its own so `resultSet.count` can be read, the
+    remaining offsets are then fetched concurrently using a bounded thread pool.
+    """
+    config = _get_api_config()
+    if config is None:
+        return
+    api_url, api_key, limit = config
+    headers = {"APIKEY": api_key}
+
+    first_page = fetch_data(_forms_url(api_url, limit), headers, **params)
+    yield first_page
+
+    offsets = _remaining_offsets(first_page, limit)
+    if not offsets:
+        return
+
+    workers = min(wagtail_jotform_settings.PAGE_WORKERS, len(offsets))
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="wagtail_jotform"
+    )
+    try:
+        # `map` yields results in submission order, so pages are merged in
+        # order even though they may complete out of order.
+        yield from executor.map(
+            in_current_context(
+                lambda offset: fetch_data(
+                    _forms_url(api_url, limit, offset), headers, **params
+                )
+            ),
+            offsets,
+        )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_jotform_forms(fields=None, **params):
+    """
+    Yield every form in the account, reduced to `fields` if given, parsing
+    each page of the `/user/forms` listing as it is streamed.
+
+    Like `iter_jotform_pages`, the pages after the first are fetched
+    concurrently. Only their reduced items are held while waiting to be
+    yielded in order.
+    """
+    config = _get_api_config()
+    if config is None:
+        return
+    api_url, api_key, limit = config
+    headers = {"APIKEY": api_key}
+
+    meta = {}
+    yield from stream_content(
+        _forms_url(api_url, limit), headers, fields, meta=meta, **params
+    )
+
+    offsets = _remaining_offsets(meta, limit)
+    if not offsets:
+        return
+
+    workers = min(wagtail_jotform_settings.PAGE_WORKERS, len(offsets))
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="wagtail_jotform"
+    )
+    try:
+        for page in executor.map(
+            in_current_context(
+                lambda offset: list(
+                    stream_content(
+                        _forms_url(api_url, limit, offset), headers, fields, **params
+                    )
+                )
+            ),
+            offsets,
+        ):
+            yield from page
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_jotform_data():
+    pages = iter_jotform_pages()
+    if (data := next(pages, None)) is None:
+        return None
+
+    for page in pages:
+        data.setdefault("content", []).extend(page.get("content", []))
+
+    return data
 
 
 class _BaseContentAPI:
@@ -80,3 +505,13 @@ class _BaseContentAPI:
 class JotFormAPI(_BaseContentAPI):
     def __init__(self):
         super().__init__(fetch_jotform_data)
+
+    def get_forms(self, fields=None):
+        """
+        Return a list of every form, streamed and reduced to `fields`, or
+        `None` if the API can't be reached.
+        """
+        try:
+            return list(iter_jotform_forms(fields))
+        except CantPullFromAPI:
+            return None
@@ -0,0 +1,72 @@
+import hmac
+
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .accounts import get_account_names, using_account
+from .export import EXPORT_FORMATS, iter_submission_rows
+from .models import EmbeddedFormPage, search_form_choices
+from .settings import wagtail_jotform_settings
+from .webhooks import parse_webhook, submission_buffer
+
+
+def search_forms(request):
+    query = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("p", 1)), 1)
+    except ValueError:
+        page = 1
+    account = request.GET.get("account")
+    if account is not None and account not in get_account_names():
+        raise Http404
+
+    with using_account(account):
+        results, has_next = search_form_choices(query, page)
+    return JsonResponse(
+        {
+            "results": [{"id": form_id, "title": title} for form_id, title in results],
+            "page": page,
+            "has_next": has_next,
+        }
+    )
+
+
+@csrf_exempt
+@require_POST
+def receive_webhook(request):
+    secret = wagtail_jotform_settings.WEBHOOK_SECRET
+    token = request.GET.get("token", "")
+    if not secret or not hmac.compare_digest(token.encode(), secret.encode()):
+        return HttpResponse(status=403)
+
+    submission = parse_webhook(request.POST)
+    if submission is None:
+        return HttpResponseBadRequest()
+    if not submission_buffer.add(submission):
+        # Ask Jotform to try again once the buffer has been written
+        return HttpResponse(status=503)
+    return HttpResponse(status=202)
+
+
+def export_submissions(request, page_id, export_format):
+    page = get_object_or_404(EmbeddedFormPage, pk=page_id)
+    if not page.permissions_for_user(request.user).can_edit():
+        raise PermissionDenied
+    if not page.form or export_format not in EXPORT_FORMATS:
+        raise Http404
+
+    content_type, encode = EXPORT_FORMATS[export_format]
+    rows = iter_submission_rows(page.form, account=page.get_jotform_account())
+    response = StreamingHttpResponse(encode(rows), content_type=content_type)
+    filename = f"{page.slug}-submissions.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -1,38 +1,47 @@
 import logging
 
-from wagtail import hooks
+from django.urls import path
 
-import requests
+from wagtail import hooks
 
+from . import views
+from .accounts import get_account_for_page, using_account
 from .models import EmbeddedFormPage
-from .settings import wagtail_jotform_settings
-from .utils import CantPullFromAPI
+from .page_cache import invalidate_page
+from .publishing import get_publish_backend, properties_changed
+from .signals import publish_outcome
 
-logging.basicConfig(level=logging.CRITICAL)
 logger = logging.getLogger(__name__)
 
 
 @hooks.register("after_publish_page")
 def do_after_publish_page(request, page):
-    if not isinstance(page, EmbeddedFormPage) or not page.form:
+    if not isinstance(page, EmbeddedFormPage):
+        return
+    invalidate_page(page)
+    if not page.form:
         return
-    thank_you_url = page.full_url + page.specific.reverse_subpage(
-        "embedded_form_thank_you"
-    )
-
-    params = (("apiKey", wagtail_jotform_settings.API_KEY),)
-    form_properties = {
-        "activeRedirect": "thankurl",
-        "thankurl": f"{thank_you_url}",
-    }
-    properties = {f"properties[{key}]": form_properties[key] for key in form_properties}
-
-    try:
-        requests.post(
-            f"{wagtail_jotform_settings.API_URL}/form/{page.form}/properties",
-            params=params,
-            data=properties,
-            timeout=10,
-        )
-    except Exception as e:
-        raise CantPullFromAPI("Cant post") from e
+    with using_account(get_account_for_page(page)):
+        # Don't push again if nothing Jotform knows about has changed
+        if not properties_changed(page):
+            publish_outcome.send(
+                sender=EmbeddedFormPage, page=page, outcome="unchanged"
+            )
+            return
+        get_publish_backend().enqueue(page)
+
+
+@hooks.register("register_admin_urls")
+def register_admin_urls():
+    return [
+        path(
+            "jotform/forms/",
+            views.search_forms,
+            name="wagtail_jotform_search_forms",
+        ),
+        path(
+            "jotform/pages/<int:page_id>/submissions.<str:export_format>",
+            views.export_submissions,
+            name="wagtail_jotform_export_submissions",
+        ),
+    ]
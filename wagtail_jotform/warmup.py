@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .accounts import get_account_names, using_account
+from .cache import _acquire_lock, _release_lock
+from .models import _fetch_form_choices, _get_choices_entry, get_choices_cache_key
+from .settings import wagtail_jotform_settings
+
+logger = logging.getLogger(__name__)
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def _is_configured():
+    return bool(wagtail_jotform_settings.API_URL and wagtail_jotform_settings.API_KEY)
+
+
+def _is_due(key, within):
+    entry = _get_choices_entry(key)
+    return entry is None or entry["refresh_at"] <= time.time() + within
+
+
+def _warm_account(account, stale_within):
+    with using_account(account):
+        if not _is_configured():
+            return None
+        key = get_choices_cache_key()
+        if stale_within is None:
+            return len(_fetch_form_choices(raise_on_error=True))
+        if not _is_due(key, stale_within):
+            return len(_get_choices_entry(key)["choices"])
+
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        # Leave the refresh to another process if it's already running it
+        if not _acquire_lock(lock_key, token):
+            return None
+        try:
+            return len(_fetch_form_choices(raise_on_error=True))
+        finally:
+            _release_lock(lock_key, token)
+
+
+def warm_form_choices(accounts=None, stale_within=None):
+    """
+    Fetch the form choices of each of `accounts`, defaulting to every
+    configured account, in parallel, and fill their caches.
+
+    With `stale_within`, only choices that are missing or will be due for a
+    refresh within that many seconds are fetched.
+
+    Returns a dict of the number of choices, or the error, by account.
+    Accounts without an API key, or already being refreshed by another
+    process, are left out.
+    """
+    accounts = list(accounts or get_account_names())
+    results = {}
+    with ThreadPoolExecutor(
+        max_workers=len(accounts), thread_name_prefix="wagtail_jotform_warmup"
+    ) as executor:
+        futures = {
+            account: executor.submit(_warm_account, account, stale_within)
+            for account in accounts
+        }
+        for account, future in futures.items():
+            try:
+                count = future.result()
+            except Exception as e:
+                results[account] = e
+            else:
+                if count is not None:
+                    results[account] = count
+    return results
+
+
+class ChoicesRefresher(threading.Thread):
+    """
+    Keep the form choices of every account fresh from a daemon thread,
+    checking every `CHOICES_REFRESH_INTERVAL` seconds and refreshing choices
+    that will be due for a refresh before the next check.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name="wagtail_jotform_refresher", daemon=True)
+        self.interval = interval
+        self.pid = os.getpid()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                for account, result in warm_form_choices(
+                    stale_within=self.interval
+                ).items():
+                    if isinstance(result, Exception):
+                        logger.warning(
+                            f"Failed to refresh choices of {account}: {result}"
+                        )
+            except Exception:
+                logger.exception("Failed to refresh the form choices")
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_refresher(**kwargs):
+    """
+    Start the `ChoicesRefresher` for this process if `CHOICES_REFRESH_INTERVAL`
+    is set. Connected to `request_started`, so it's started by the first
+    request each worker handles, and not by management commands.
+    """
+    global _refresher
+    interval = wagtail_jotform_settings.CHOICES_REFRESH_INTERVAL
+    if not interval:
+        return None
+    with _refresher_lock:
+        if _refresher is None or _refresher.pid != os.getpid():
+            _refresher = ChoicesRefresher(interval)
+            _refresher.start()
+        return _refresher
+
+
+def stop_refresher():
+    global _refresher
+    with _refresher_lock:
+        if _refresher is not None:
+            _refresher.stop()
+        _refresher = None
@@ -0,0 +1,174 @@
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.utils import timezone
+
+from .models import JotFormSubmission
+from .settings import wagtail_jotform_settings
+
+logger = logging.getLogger(__name__)
+
+# Answers are posted as `q<question id>_<question name>`, alongside metadata
+# such as `slug`, `event_id` and `timeToSubmit`
+ANSWER_KEY = re.compile(r"^q(\d+)_(.+)$")
+
+
+def _answers_from_raw_request(raw_request):
+    """
+    Return the answers in a webhook's `rawRequest`, keyed by question id with
+    the question's name and answer, as the API returns them.
+    """
+    answers = {}
+    for key, value in raw_request.items():
+        if match := ANSWER_KEY.match(key):
+            qid, name = match.groups()
+            answers[qid] = {"name": name, "answer": value}
+    return answers
+
+
+def parse_webhook(data):
+    """
+    Return a `JotFormSubmission` from the POST data of a Jotform webhook, or
+    `None` if it isn't a submission.
+    """
+    submission_id = data.get("submissionID")
+    form_id = data.get("formID")
+    if not submission_id or not form_id:
+        return None
+    try:
+        raw_request = json.loads(data.get("rawRequest") or "{}")
+    except ValueError:
+        raw_request = {}
+    if not isinstance(raw_request, dict):
+        raw_request = {}
+    return JotFormSubmission(
+        submission_id=submission_id,
+        form_id=form_id,
+        status="ACTIVE",
+        ip=data.get("ip", ""),
+        answers=_answers_from_raw_request(raw_request),
+        # Replaced by Jotform's timestamp when the submission is next synced
+        created_at=timezone.now(),
+    )
+
+
+class SubmissionBuffer:
+    """
+    Collect submissions received by the webhook in memory, and write them to
+    the database in batches from a background thread.
+
+    A batch is written once `WEBHOOK_BATCH_SIZE` submissions are buffered, or
+    `WEBHOOK_FLUSH_INTERVAL` seconds after the first of them arrived, and any
+    left over are written when the process exits. Failed writes are retried
+    after the same interval. At most `WEBHOOK_BUFFER_LIMIT` submissions are
+    held, and `add` refuses more while the buffer is full.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self._submissions = []
+        self._timer = None
+        self._flush_queued = False
+        self._executor = None
+
+    def _check_pid(self):
+        # A forked worker starts with an empty buffer, not a copy of its parent's
+        if self.pid != os.getpid():
+            self._reset()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="wagtail_jotform_webhook"
+            )
+        return self._executor
+
+    def __len__(self):
+        with self._lock:
+            return len(self._submissions)
+
+    def add(self, submission):
+        """
+        Buffer `submission`, returning `False` if the buffer is full.
+        """
+        with self._lock:
+            self._check_pid()
+            if len(self._submissions) >= wagtail_jotform_settings.WEBHOOK_BUFFER_LIMIT:
+                return False
+            self._submissions.append(submission)
+            if self._flush_queued:
+                return True
+            if len(self._submissions) >= wagtail_jotform_settings.WEBHOOK_BATCH_SIZE:
+                self._cancel_timer()
+                self._flush_queued = True
+                self._get_executor().submit(self._flush_in_thread)
+            else:
+                self._start_timer()
+            return True
+
+    def _start_timer(self):
+        if self._timer is None:
+            self._timer = threading.Timer(
+                wagtail_jotform_settings.WEBHOOK_FLUSH_INTERVAL,
+                self._flush_in_thread,
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def flush(self):
+        """
+        Write the buffered submissions, skipping any that are already stored.
+        Returns the number of submissions written.
+        """
+        with self._lock:
+            self._check_pid()
+            self._cancel_timer()
+            self._flush_queued = False
+            submissions, self._submissions = self._submissions, []
+        if not submissions:
+            return 0
+
+        try:
+            JotFormSubmission.objects.bulk_create(
+                submissions,
+                batch_size=wagtail_jotform_settings.SYNC_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+        except Exception:
+            logger.exception(f"Failed to write {len(submissions)} webhook submissions")
+            # Keep them for the next flush, and retry even if no more arrive
+            with self._lock:
+                self._submissions[:0] = submissions
+                limit = wagtail_jotform_settings.WEBHOOK_BUFFER_LIMIT
+                if len(self._submissions) > limit:
+                    dropped = len(self._submissions) - limit
+                    del self._submissions[limit:]
+                    logger.error(f"Dropped {dropped} webhook submissions")
+                self._start_timer()
+            return 0
+        return len(submissions)
+
+
+submission_buffer = SubmissionBuffer()
+atexit.register(submission_buffer.flush)
@@ -0,0 +1,37 @@
+from urllib.parse import urlencode
+
+from django import forms
+from django.urls import reverse
+
+from .accounts import using_account
+from .settings import DEFAULT_ACCOUNT
+
+
+class JotFormChooser(forms.Widget):
+    """
+    A search box for choosing a Jotform form. Matching forms are loaded a page
+    at a time from the `wagtail_jotform_search_forms` admin view, so the full
+    list of forms is never sent to the browser.
+    """
+
+    template_name = "wagtail_jotform/widgets/form_chooser.html"
+
+    def __init__(self, attrs=None, account=DEFAULT_ACCOUNT):
+        super().__init__(attrs)
+        # Set by `EmbeddedFormPageAdminForm` from the page's site
+        self.account = account
+
+    def get_context(self, name, value, attrs):
+        from .models import get_form_choice_title
+
+        context = super().get_context(name, value, attrs)
+        search_url = reverse("wagtail_jotform_search_forms")
+        if self.account != DEFAULT_ACCOUNT:
+            search_url += "?" + urlencode({"account": self.account})
+        context["widget"]["search_url"] = search_url
+        with using_account(self.account):
+            context["widget"]["title"] = get_form_choice_title(value) if value else ""
+        return context
+
+    class Media:
+        js = ["wagtail_jotform/js/form-chooser.js"]